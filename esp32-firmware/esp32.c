@@ -16,6 +16,7 @@ uint8_t batteryAddress = 0x0B;
 #define CMD_FULL_CAP 0x10
 #define CMD_CYCLE_COUNT 0x17
 #define CMD_BATTERY_STATUS 0x16
+#define CMD_SERIAL_NUMBER 0x1C
 
 // Cell Voltage Commands (Typical for TI BQ series)
 // 0x3C is typically lowest cell (Cell 1)
@@ -80,6 +81,7 @@ void loop() {
       uint16_t fullCap = readWord(CMD_FULL_CAP);        // mAh
       uint16_t cycles = readWord(CMD_CYCLE_COUNT);      // count
       uint16_t status = readWord(CMD_BATTERY_STATUS);   // Battery Status
+      uint16_t serialNo = readWord(CMD_SERIAL_NUMBER);  // Pack serial
 
       // Read Cells
       uint16_t val_cell1 = readWord(CMD_CELL1_ADDR);
@@ -114,6 +116,11 @@ void loop() {
       Serial.print(0);
       Serial.print(",\"GaugeType\":");
       Serial.print("\"SMBus Standard\"");
+      if (serialNo != 0xFFFF) {
+        Serial.print(",\"SerialNumber\":\"");
+        Serial.print(serialNo);
+        Serial.print("\"");
+      }
 
       // 3. Cells
       Serial.print(",\"Cells\":[");
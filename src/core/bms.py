@@ -5,10 +5,34 @@ import random
 import json
 import time
 
+from src.core.sample import BMSSample, decode_safety_status, decode_pf_status
+
+SIMULATION_PORT = "SIM"
+
 class BMSManager:
     def __init__(self, baudrate=115200):
         self.baudrate = baudrate
         self.ser = None
+        self.port = None
+        self.listeners = []
+        self.sim_serial = None
+
+    def add_listener(self, callback):
+        """Register callback(sample), called for every sample read."""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _publish(self, sample):
+        for callback in list(self.listeners):
+            try:
+                callback(sample)
+            except Exception as e:
+                print(f"Sample listener error: {e}")
+        return sample
 
     def connect(self, port_name):
         """Connect to the specified serial port."""
@@ -19,21 +43,32 @@ class BMSManager:
         clean_port = port_name.split(" - ")[0].strip()
         
         self.ser = serial.Serial(clean_port, self.baudrate, timeout=2)
+        self.port = clean_port
         time.sleep(1) # Wait for connection to stabilize
         return clean_port
 
+    def reset_simulation(self):
+        """Start a new simulated pack (new serial) on the next simulated read."""
+        self.sim_serial = None
+
     def disconnect(self):
         if self.ser and self.ser.is_open:
             self.ser.close()
         self.ser = None
+        self.port = None
 
     def is_connected(self):
         return self.ser is not None and self.ser.is_open
 
     def read_data(self, simulation_mode=False):
-        """Read data from BMS or generate fake data."""
+        """Read one sample from the BMS (or generate a fake one) as a BMSSample."""
         if simulation_mode:
-            return self.generate_fake_data()
+            # One simulated pack per simulation run, like a real connection
+            if self.sim_serial is None:
+                self.sim_serial = f"SIM-{random.randint(1, 9999):04d}"
+            data = self.generate_fake_data()
+            data["SerialNumber"] = self.sim_serial
+            return self._publish(BMSSample.from_dict(data, port=SIMULATION_PORT))
         
         if not self.is_connected():
             raise ConnectionError("Not connected to BMS")
@@ -41,13 +76,15 @@ class BMSManager:
         self.ser.reset_input_buffer()
         self.ser.write(b'READ_ALL\n')
         line = self.ser.readline().decode().strip()
+        recv_ts = time.time()
         if not line:
             raise ValueError("No data received from BMS")
             
         try:
-            return json.loads(line)
+            data = json.loads(line)
         except json.JSONDecodeError:
             raise ValueError(f"Invalid data received: {line}")
+        return self._publish(BMSSample.from_dict(data, port=self.port, recv_ts=recv_ts))
 
     @staticmethod
     def get_com_ports():
@@ -97,23 +134,8 @@ class BMSManager:
 
     @staticmethod
     def decode_safety_status(val):
-        flags = []
-        if val & (1 << 1): flags.append("Overvoltage")
-        if val & (1 << 2): flags.append("Undervoltage")
-        if val & (1 << 3): flags.append("Overtemperature")
-        if val & (1 << 4): flags.append("Short Circuit")
-        if not flags:
-            return "OK"
-        return ", ".join(flags)
+        return decode_safety_status(val)
 
     @staticmethod
     def decode_pf_status(val):
-        flags = []
-        if val & (1 << 0): flags.append("Fuse Blow Event")
-        if val & (1 << 1): flags.append("Cell Overvoltage")
-        if val & (1 << 2): flags.append("Cell Undervoltage")
-        if val & (1 << 3): flags.append("Overtemperature")
-        if val & (1 << 4): flags.append("Charge Timeout")
-        if not flags:
-            return "No Permanent Failure"
-        return ", ".join(flags)
+        return decode_pf_status(val)
@@ -0,0 +1,297 @@
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+import datetime
+
+import numpy as np
+
+from src.core.sample import SAFETY_ALARM_MASK, PF_ALARM_MASK, NO_PACK, as_sample, cell_min_max
+from src.core.session import SessionReader, SESSION_EXT
+
+CATALOG_FILENAME = "amplyze_catalog.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    file_size INTEGER NOT NULL,
+    pack_serial TEXT,
+    port TEXT,
+    gauge_type TEXT,
+    start_ts REAL,
+    end_ts REAL,
+    n_samples INTEGER,
+    passed INTEGER,
+    min_cell_mv INTEGER,
+    max_cell_mv INTEGER,
+    max_delta_mv INTEGER,
+    safety_alarms INTEGER,
+    pf_alarms INTEGER,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_ts);
+CREATE INDEX IF NOT EXISTS idx_sessions_serial ON sessions(pack_serial, start_ts);
+CREATE INDEX IF NOT EXISTS idx_sessions_delta ON sessions(max_delta_mv);
+
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    session_path TEXT,
+    created_ts REAL,
+    pack_serial TEXT,
+    port TEXT,
+    gauge_type TEXT,
+    passed INTEGER,
+    min_cell_mv INTEGER,
+    max_cell_mv INTEGER,
+    delta_mv INTEGER,
+    safety_alarms INTEGER,
+    pf_alarms INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports(created_ts);
+CREATE INDEX IF NOT EXISTS idx_reports_serial ON reports(pack_serial, created_ts);
+"""
+
+# query() keyword -> (SQL expression, comparison operator)
+_SESSION_FILTERS = {
+    "pack_serial": ("pack_serial", "="),
+    "port": ("port", "="),
+    "gauge_type": ("gauge_type", "="),
+    "since": ("start_ts", ">="),
+    "until": ("start_ts", "<="),
+    "passed": ("passed", "="),
+    "delta_above_mv": ("max_delta_mv", ">"),
+    "min_cell_below_mv": ("min_cell_mv", "<"),
+    "max_cell_above_mv": ("max_cell_mv", ">"),
+    "min_alarms": ("safety_alarms + pf_alarms", ">="),
+}
+
+_REPORT_NAME_RE = re.compile(r"Amplyze_Report_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2})\.pdf$")
+
+
+def summarize_samples(arr, pack=NO_PACK):
+    """Index fields for a block of packed samples from `pack`, computed column-wise."""
+    if len(arr) == 0:
+        return None
+    lo, hi = cell_min_max(arr)
+    has_cells = arr["n_cells"] > 0
+    safety_alarms = int(np.count_nonzero(arr["safety_status"] & SAFETY_ALARM_MASK))
+    pf_alarms = int(np.count_nonzero(arr["pf_status"] & PF_ALARM_MASK))
+    return {
+        "pack_serial": pack.serial,
+        "port": pack.port,
+        "gauge_type": pack.gauge_type,
+        "start_ts": float(arr["recv_ts"][0]),
+        "end_ts": float(arr["recv_ts"][-1]),
+        "n_samples": len(arr),
+        "passed": int(safety_alarms == 0 and pf_alarms == 0),
+        "min_cell_mv": int(lo[has_cells].min()) if has_cells.any() else None,
+        "max_cell_mv": int(hi[has_cells].max()) if has_cells.any() else None,
+        "max_delta_mv": int((hi - lo)[has_cells].max()) if has_cells.any() else None,
+        "safety_alarms": safety_alarms,
+        "pf_alarms": pf_alarms,
+    }
+
+
+class Catalog:
+    """SQLite index of recorded sessions and generated reports.
+
+    Rows hold only summary fields, so queries never open session files
+    or PDFs. Sessions are indexed when they close (index_session) and
+    reports when they are saved (index_report); scan() picks up anything
+    written while the catalog was not running.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _session_row(path):
+        with SessionReader(path) as reader:
+            row = summarize_samples(reader.samples, reader.pack)
+        if row is not None:
+            row["path"] = path
+            row["file_size"] = os.path.getsize(path)
+            row["indexed_at"] = time.time()
+        return row
+
+    def _insert_sessions(self, rows):
+        if rows:
+            cols = ", ".join(rows[0])
+            marks = ", ".join(f":{k}" for k in rows[0])
+            with self.conn:
+                self.conn.executemany(f"INSERT OR REPLACE INTO sessions ({cols}) VALUES ({marks})", rows)
+
+    def index_session(self, path):
+        """Add or refresh one session file. Returns False if it has no samples."""
+        row = self._session_row(os.path.abspath(path))
+        if row is None:
+            return False
+        self._insert_sessions([row])
+        return True
+
+    def index_report(self, path, data, session_path=None, created_ts=None):
+        """Record a report generated from `data` (BMSSample or firmware dict)."""
+        sample = as_sample(data)
+        cells = list(sample.cells)
+        safety_alarms = int(bool(sample.safety_status & SAFETY_ALARM_MASK))
+        pf_alarms = int(bool(sample.pf_status & PF_ALARM_MASK))
+        row = {
+            "path": os.path.abspath(path),
+            "session_path": os.path.abspath(session_path) if session_path else None,
+            "created_ts": time.time() if created_ts is None else created_ts,
+            "pack_serial": sample.serial,
+            "port": sample.port,
+            "gauge_type": sample.gauge_type,
+            "passed": int(safety_alarms == 0 and pf_alarms == 0),
+            "min_cell_mv": min(cells) if cells else None,
+            "max_cell_mv": max(cells) if cells else None,
+            "delta_mv": max(cells) - min(cells) if cells else None,
+            "safety_alarms": safety_alarms,
+            "pf_alarms": pf_alarms,
+        }
+        cols = ", ".join(row)
+        marks = ", ".join(f":{k}" for k in row)
+        with self.conn:
+            self.conn.execute(f"INSERT OR REPLACE INTO reports ({cols}) VALUES ({marks})", row)
+
+    def scan(self, sessions_dir=None, reports_dir=None):
+        """Index session files and reports that are new or have changed size.
+
+        Reports found this way only carry the time parsed from their name;
+        their contents are never read.
+        """
+        added = 0
+        if sessions_dir and os.path.isdir(sessions_dir):
+            known = dict(self.conn.execute("SELECT path, file_size FROM sessions"))
+            rows = []
+            for name in sorted(os.listdir(sessions_dir)):
+                if not name.endswith(SESSION_EXT):
+                    continue
+                path = os.path.abspath(os.path.join(sessions_dir, name))
+                if known.get(path) == os.path.getsize(path):
+                    continue
+                try:
+                    row = self._session_row(path)
+                except ValueError as e:
+                    print(f"Skipping session {name}: {e}")
+                    continue
+                if row is not None:
+                    rows.append(row)
+            self._insert_sessions(rows)
+            added += len(rows)
+        if reports_dir and os.path.isdir(reports_dir):
+            known = {r[0] for r in self.conn.execute("SELECT path FROM reports")}
+            rows = []
+            for name in sorted(os.listdir(reports_dir)):
+                m = _REPORT_NAME_RE.match(name)
+                path = os.path.abspath(os.path.join(reports_dir, name))
+                if not m or path in known:
+                    continue
+                ts = datetime.datetime.strptime(m.group(1), "%Y-%m-%d_%H-%M").timestamp()
+                rows.append((path, ts))
+            with self.conn:
+                self.conn.executemany("INSERT INTO reports (path, created_ts) VALUES (?, ?)", rows)
+            added += len(rows)
+        return added
+
+    def query(self, limit=None, **filters):
+        """Return session rows matching keyword filters (see _SESSION_FILTERS).
+
+        Example: query(delta_above_mv=30, since=time.time() - 7 * 86400)
+        """
+        clauses, params = [], []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key not in _SESSION_FILTERS:
+                raise ValueError(f"Unknown catalog filter: {key}")
+            expr, op = _SESSION_FILTERS[key]
+            clauses.append(f"{expr} {op} ?")
+            params.append(int(value) if isinstance(value, bool) else value)
+        sql = "SELECT * FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY start_ts DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self.conn.execute(sql, params).fetchall()
+
+    def reports_for(self, pack_serial=None, since=None, until=None):
+        """Return report rows, newest first."""
+        clauses, params = [], []
+        if pack_serial is not None:
+            clauses.append("pack_serial = ?")
+            params.append(pack_serial)
+        if since is not None:
+            clauses.append("created_ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_ts <= ?")
+            params.append(until)
+        sql = "SELECT * FROM reports"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.conn.execute(sql + " ORDER BY created_ts DESC", params).fetchall()
+
+
+def default_catalog_path(project_root):
+    return os.path.join(project_root, "sessions", CATALOG_FILENAME)
+
+
+def main(argv=None):
+    """Command-line catalog search, e.g.
+
+        python -m src.core.catalog --delta-above 30 --days 7
+    """
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    parser = argparse.ArgumentParser(description="Search the Amplyze session catalog.")
+    parser.add_argument("--db", default=default_catalog_path(project_root))
+    parser.add_argument("--scan", action="store_true", help="index new sessions/reports first")
+    parser.add_argument("--serial", dest="pack_serial")
+    parser.add_argument("--port")
+    parser.add_argument("--gauge", dest="gauge_type")
+    parser.add_argument("--days", type=float, help="only sessions from the last N days")
+    parser.add_argument("--delta-above", dest="delta_above_mv", type=int,
+                        help="only sessions whose max cell delta exceeds N mV")
+    parser.add_argument("--failed", action="store_true", help="only sessions with alarms")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    with Catalog(args.db) as catalog:
+        if args.scan:
+            catalog.scan(os.path.join(project_root, "sessions"), os.path.join(project_root, "reports"))
+        since = time.time() - args.days * 86400 if args.days else None
+        rows = catalog.query(limit=args.limit, pack_serial=args.pack_serial, port=args.port,
+                             gauge_type=args.gauge_type, since=since, delta_above_mv=args.delta_above_mv,
+                             passed=False if args.failed else None)
+
+    for r in rows:
+        start = datetime.datetime.fromtimestamp(r["start_ts"]).strftime("%Y-%m-%d %H:%M")
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"{start}  {r['pack_serial'] or '-':<12} {r['port'] or '-':<14} {status:<4} "
+              f"delta={r['max_delta_mv']}mV  cells={r['min_cell_mv']}-{r['max_cell_mv']}mV  "
+              f"n={r['n_samples']}  {os.path.basename(r['path'])}")
+    print(f"{len(rows)} session(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
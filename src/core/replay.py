@@ -0,0 +1,153 @@
+import time
+
+from src.core.session import SessionReader
+
+DEFAULT_CHUNK = 4096
+REPLAY_TICK_S = 0.05
+REPLAY_SPEEDS = (1, 10, 100, 1000)
+
+
+class SessionReplay:
+    """Play a recorded session back on a virtual clock.
+
+    The file is memory-mapped and read in chunks of at most `chunk_size`
+    records, so sessions of any length replay in bounded memory. Seeking is
+    a binary search on the receive-timestamp column.
+
+    Typical use from a GUI timer:
+
+        replay.play()
+        block = replay.advance()   # samples that became due since last call
+
+    For headless profiling, blocks() yields the session as fast as it can
+    be read, independent of wall-clock time.
+    """
+
+    def __init__(self, path, speed=1.0, chunk_size=DEFAULT_CHUNK, clock=time.monotonic):
+        self.reader = SessionReader(path)
+        self.speed = float(speed)
+        self.chunk_size = chunk_size
+        self.clock = clock
+        self.position = 0
+        self.playing = False
+        self._session_ts = self.reader.start_ts
+        self._wall_ts = None
+
+    def __len__(self):
+        return len(self.reader)
+
+    @property
+    def start_ts(self):
+        return self.reader.start_ts
+
+    @property
+    def end_ts(self):
+        return self.reader.end_ts
+
+    @property
+    def finished(self):
+        return self.position >= len(self.reader)
+
+    def current_ts(self):
+        """Session time the playback clock is currently at."""
+        if self._session_ts is None:
+            return None
+        if not self.playing:
+            return self._session_ts
+        return self._session_ts + (self.clock() - self._wall_ts) * self.speed
+
+    def play(self):
+        if not self.playing:
+            self._wall_ts = self.clock()
+            self.playing = True
+
+    def pause(self):
+        if self.playing:
+            self._session_ts = self.current_ts()
+            self.playing = False
+
+    def set_speed(self, speed):
+        """Change speed without jumping in session time."""
+        if self.playing:
+            self._session_ts = self.current_ts()
+            self._wall_ts = self.clock()
+        self.speed = float(speed)
+
+    def seek(self, ts):
+        """Jump to the first sample at or after session time `ts`."""
+        if self._session_ts is None:
+            return
+        self.position = self.reader.index_at(ts)
+        self._session_ts = max(ts, self.start_ts)
+        self._wall_ts = self.clock()
+
+    def advance(self):
+        """Return the samples that have become due, oldest first.
+
+        At most chunk_size records are returned per call; if playback has
+        fallen further behind, the rest follow on subsequent calls.
+        """
+        if not self.playing or self.finished:
+            return self.reader.read(0, 0)
+        stop = self.reader.index_at(self.current_ts(), side="right")
+        stop = max(self.position, min(stop, self.position + self.chunk_size))
+        block = self.reader.read(self.position, stop)
+        self.position = stop
+        return block
+
+    def blocks(self, chunk_size=None):
+        """Yield the rest of the session in chunks, without pacing."""
+        chunk_size = chunk_size or self.chunk_size
+        n = len(self.reader)
+        while self.position < n:
+            stop = min(self.position + chunk_size, n)
+            block = self.reader.read(self.position, stop)
+            self.position = stop
+            yield block
+
+    def close(self):
+        self.playing = False
+        self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    """Headless replay, e.g. as a hardware-free workload for profiling:
+
+        python -m src.core.replay sessions/Amplyze_Session_....amps --speed 1000
+    """
+    import argparse
+    from src.core.catalog import summarize_samples
+
+    parser = argparse.ArgumentParser(description="Replay a recorded Amplyze session.")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="playback speed (0 = as fast as possible)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK)
+    args = parser.parse_args(argv)
+
+    with SessionReplay(args.path, speed=args.speed or 1, chunk_size=args.chunk) as replay:
+        t = time.perf_counter()
+        count = 0
+        if args.speed:
+            replay.play()
+            while not replay.finished:
+                count += len(replay.advance())
+                time.sleep(REPLAY_TICK_S)
+        else:
+            for block in replay.blocks():
+                summarize_samples(block)
+                count += len(block)
+        elapsed = time.perf_counter() - t
+    print(f"Replayed {count} samples in {elapsed:.3f}s ({count / max(elapsed, 1e-9):.0f} samples/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import json
+import time
+import struct
+from array import array
+
+import numpy as np
+
+# Default number of cell slots in a packed record. Sessions and telemetry
+# size their records to the pack's own cell count with make_sample_dtype().
+DEFAULT_MAX_CELLS = 16
+
+PORT_LEN = 32
+GAUGE_LEN = 16
+SERIAL_LEN = 24
+
+# Status bits that decode to an alarm (see decode_safety_status / decode_pf_status)
+SAFETY_ALARM_MASK = 0b11110
+PF_ALARM_MASK = 0b11111
+
+# (attribute, JSON key from the firmware, numpy type)
+SCALAR_FIELDS = (
+    ("pack_voltage_mv", "PackVoltage_mV", "<i4"),
+    ("current_ma", "Current_mA", "<i4"),
+    ("temperature_c", "Temperature_C", "<f4"),
+    ("cycle_count", "CycleCount", "<u4"),
+    ("safety_status", "SafetyStatus", "<u4"),
+    ("pf_status", "PF_Status", "<u4"),
+    ("remain_capacity_mah", "RemainCapacity_mAh", "<i4"),
+    ("full_capacity_mah", "FullCapacity_mAh", "<i4"),
+)
+
+# Record fields written row-wise, in dtype order (everything but the cells).
+_ROW_FIELDS = ["recv_ts"] + [f[0] for f in SCALAR_FIELDS] + ["n_cells"]
+
+
+def make_sample_dtype(max_cells=DEFAULT_MAX_CELLS):
+    """Packed little-endian record layout for one sample.
+
+    The same layout is used in memory, in session files and as the binary
+    frame format, so conversion between them is a plain buffer view. The
+    pack's port, serial and gauge type are not part of the record; they are
+    stored once per session or telemetry layout (see PackInfo).
+    """
+    fields = [("recv_ts", "<f8")]
+    fields += [(name, typ) for name, _, typ in SCALAR_FIELDS]
+    fields += [
+        ("n_cells", "<u2"),
+        ("cells", "<u2", (max_cells,)),
+    ]
+    return np.dtype(fields)
+
+
+SAMPLE_DTYPE = make_sample_dtype()
+
+
+def dtype_max_cells(dtype):
+    """Number of cell slots in a sample dtype."""
+    return dtype["cells"].shape[0]
+
+
+def decode_safety_status(val):
+    flags = []
+    if val & (1 << 1): flags.append("Overvoltage")
+    if val & (1 << 2): flags.append("Undervoltage")
+    if val & (1 << 3): flags.append("Overtemperature")
+    if val & (1 << 4): flags.append("Short Circuit")
+    if not flags:
+        return "OK"
+    return ", ".join(flags)
+
+
+def decode_pf_status(val):
+    flags = []
+    if val & (1 << 0): flags.append("Fuse Blow Event")
+    if val & (1 << 1): flags.append("Cell Overvoltage")
+    if val & (1 << 2): flags.append("Cell Undervoltage")
+    if val & (1 << 3): flags.append("Overtemperature")
+    if val & (1 << 4): flags.append("Charge Timeout")
+    if not flags:
+        return "No Permanent Failure"
+    return ", ".join(flags)
+
+
+def _as_number(val):
+    """Temperature as shown by the firmware: 25 stays 25, 25.3 stays 25.3
+    (also after the float32 round trip through a record)."""
+    val = round(float(val), 2)
+    return int(val) if val.is_integer() else val
+
+
+class PackInfo:
+    """Port, serial number and gauge type of the pack a sample came from."""
+
+    __slots__ = ("port", "serial", "gauge_type")
+
+    _STRUCT = struct.Struct(f"<{PORT_LEN}s{SERIAL_LEN}s{GAUGE_LEN}s")
+    SIZE = _STRUCT.size
+
+    def __init__(self, port="", serial="", gauge_type=""):
+        self.port = port
+        self.serial = serial
+        self.gauge_type = gauge_type
+
+    @classmethod
+    def of(cls, sample):
+        return cls(sample.port, sample.serial, sample.gauge_type)
+
+    def matches(self, sample):
+        """True if `sample` came from this pack."""
+        return (self.port == sample.port and self.serial == sample.serial
+                and self.gauge_type == sample.gauge_type)
+
+    def to_bytes(self):
+        return self._STRUCT.pack(self.port.encode(), self.serial.encode(), self.gauge_type.encode())
+
+    @classmethod
+    def from_bytes(cls, raw):
+        return cls(*(f.rstrip(b"\0").decode(errors="replace") for f in cls._STRUCT.unpack(raw)))
+
+    def _key(self):
+        return (self.port, self.serial, self.gauge_type)
+
+    def __eq__(self, other):
+        return isinstance(other, PackInfo) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"PackInfo(port={self.port!r}, serial={self.serial!r}, gauge_type={self.gauge_type!r})"
+
+
+NO_PACK = PackInfo()
+
+
+class BMSSample:
+    """One reading from the BMS, stored without a per-sample dict."""
+
+    __slots__ = ("recv_ts", "port", "serial", "gauge_type") + tuple(f[0] for f in SCALAR_FIELDS) + ("cells",)
+
+    def __init__(self, recv_ts=0.0, port="", serial="", gauge_type="", pack_voltage_mv=0,
+                 current_ma=0, temperature_c=0.0, cycle_count=0, safety_status=0,
+                 pf_status=0, remain_capacity_mah=0, full_capacity_mah=0, cells=()):
+        self.recv_ts = recv_ts
+        self.port = port
+        self.serial = serial
+        self.gauge_type = gauge_type
+        self.pack_voltage_mv = pack_voltage_mv
+        self.current_ma = current_ma
+        self.temperature_c = temperature_c
+        self.cycle_count = cycle_count
+        self.safety_status = safety_status
+        self.pf_status = pf_status
+        self.remain_capacity_mah = remain_capacity_mah
+        self.full_capacity_mah = full_capacity_mah
+        self.cells = array("H", cells)
+
+    @classmethod
+    def from_dict(cls, data, port="", recv_ts=None):
+        """Build a sample from the firmware's JSON object."""
+        return cls(
+            recv_ts=time.time() if recv_ts is None else recv_ts,
+            port=port,
+            serial=str(data.get("SerialNumber", "")),
+            gauge_type=str(data.get("GaugeType", "")),
+            pack_voltage_mv=int(data.get("PackVoltage_mV", 0)),
+            current_ma=int(data.get("Current_mA", 0)),
+            temperature_c=_as_number(data.get("Temperature_C", 0)),
+            cycle_count=int(data.get("CycleCount", 0)),
+            safety_status=int(data.get("SafetyStatus", 0)),
+            pf_status=int(data.get("PF_Status", 0)),
+            remain_capacity_mah=int(data.get("RemainCapacity_mAh", 0)),
+            full_capacity_mah=int(data.get("FullCapacity_mAh", 0)),
+            cells=data.get("Cells", ()),
+        )
+
+    @classmethod
+    def from_record(cls, rec, pack=NO_PACK):
+        """Build a sample from one row of a sample array recorded from `pack`."""
+        n = int(rec["n_cells"])
+        return cls(
+            recv_ts=float(rec["recv_ts"]),
+            port=pack.port,
+            serial=pack.serial,
+            gauge_type=pack.gauge_type,
+            pack_voltage_mv=int(rec["pack_voltage_mv"]),
+            current_ma=int(rec["current_ma"]),
+            temperature_c=_as_number(rec["temperature_c"]),
+            cycle_count=int(rec["cycle_count"]),
+            safety_status=int(rec["safety_status"]),
+            pf_status=int(rec["pf_status"]),
+            remain_capacity_mah=int(rec["remain_capacity_mah"]),
+            full_capacity_mah=int(rec["full_capacity_mah"]),
+            cells=rec["cells"][:n].tolist(),
+        )
+
+    def to_dict(self):
+        """Return the firmware-style dict, including decoded status strings."""
+        return {
+            "PackVoltage_mV": self.pack_voltage_mv,
+            "Current_mA": self.current_ma,
+            "Temperature_C": self.temperature_c,
+            "CycleCount": self.cycle_count,
+            "SafetyStatus": self.safety_status,
+            "PF_Status": self.pf_status,
+            "GaugeType": self.gauge_type,
+            "SerialNumber": self.serial,
+            "Cells": list(self.cells),
+            "RemainCapacity_mAh": self.remain_capacity_mah,
+            "FullCapacity_mAh": self.full_capacity_mah,
+            "SafetyStatusStr": self.safety_status_str,
+            "PFStatusStr": self.pf_status_str,
+        }
+
+    def row(self):
+        """Scalar values in record order (cells are written separately)."""
+        return (self.recv_ts, self.pack_voltage_mv, self.current_ma, self.temperature_c, self.cycle_count,
+                self.safety_status, self.pf_status, self.remain_capacity_mah,
+                self.full_capacity_mah, len(self.cells))
+
+    @property
+    def safety_status_str(self):
+        return decode_safety_status(self.safety_status)
+
+    @property
+    def pf_status_str(self):
+        return decode_pf_status(self.pf_status)
+
+    def __repr__(self):
+        return (f"BMSSample(port={self.port!r}, recv_ts={self.recv_ts:.3f}, "
+                f"pack_voltage_mv={self.pack_voltage_mv}, cells={list(self.cells)})")
+
+
+def as_sample(data, port="", recv_ts=None):
+    """Accept either a BMSSample or a firmware dict and return a BMSSample."""
+    if isinstance(data, BMSSample):
+        return data
+    return BMSSample.from_dict(data or {}, port=port, recv_ts=recv_ts)
+
+
+def samples_to_array(samples, dtype=SAMPLE_DTYPE):
+    """Pack a sequence of BMSSample objects into one structured array.
+
+    Raises ValueError if a sample has more cells than the dtype has slots.
+    """
+    out = np.zeros(len(samples), dtype=dtype)
+    rows = out[_ROW_FIELDS]
+    cells = out["cells"]
+    max_cells = cells.shape[1]
+    for i, s in enumerate(samples):
+        k = len(s.cells)
+        if k > max_cells:
+            raise ValueError(f"Sample has {k} cells but the record holds {max_cells}")
+        rows[i] = s.row()
+        cells[i, :k] = s.cells
+    return out
+
+
+def samples_from_json(lines, recv_ts=None, dtype=SAMPLE_DTYPE):
+    """Parse firmware JSON lines (str/bytes or already-decoded dicts) in bulk.
+
+    recv_ts may be a single timestamp or a sequence with one per line. Pack
+    identity (SerialNumber, GaugeType) is not part of the record.
+    """
+    n = len(lines)
+    out = np.zeros(n, dtype=dtype)
+    rows = out[_ROW_FIELDS]
+    cells = out["cells"]
+    max_cells = cells.shape[1]
+    if recv_ts is None:
+        recv_ts = time.time()
+    per_line_ts = np.ndim(recv_ts) > 0
+    for i, line in enumerate(lines):
+        d = line if isinstance(line, dict) else json.loads(line)
+        c = d.get("Cells", ())
+        k = len(c)
+        if k > max_cells:
+            raise ValueError(f"Sample has {k} cells but the record holds {max_cells}")
+        rows[i] = (
+            recv_ts[i] if per_line_ts else recv_ts,
+            d.get("PackVoltage_mV", 0),
+            d.get("Current_mA", 0),
+            d.get("Temperature_C", 0.0),
+            d.get("CycleCount", 0),
+            d.get("SafetyStatus", 0),
+            d.get("PF_Status", 0),
+            d.get("RemainCapacity_mAh", 0),
+            d.get("FullCapacity_mAh", 0),
+            k,
+        )
+        cells[i, :k] = c
+    return out
+
+
+def samples_from_frames(buf, dtype=SAMPLE_DTYPE):
+    """View a buffer of concatenated binary frames as a sample array (no copy)."""
+    return np.frombuffer(buf, dtype=dtype)
+
+
+def samples_to_frames(arr):
+    """Serialise a sample array to concatenated binary frames."""
+    return np.ascontiguousarray(arr).tobytes()
+
+
+def cell_min_max(arr):
+    """Per-sample (min, max) cell voltage for a sample array, ignoring empty slots.
+
+    Samples without cells get min=max=0.
+    """
+    cells = arr["cells"]
+    valid = np.arange(cells.shape[1]) < arr["n_cells"][:, None]
+    has_cells = arr["n_cells"] > 0
+    lo = np.where(valid, cells, np.iinfo(cells.dtype).max).min(axis=1, initial=np.iinfo(cells.dtype).max)
+    hi = np.where(valid, cells, 0).max(axis=1, initial=0)
+    return np.where(has_cells, lo, 0), hi
+
+
+def iter_samples(arr, pack=NO_PACK):
+    """Yield BMSSample objects for each row of a sample array recorded from `pack`."""
+    for rec in arr:
+        yield BMSSample.from_record(rec, pack)
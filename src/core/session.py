@@ -0,0 +1,160 @@
+import os
+import struct
+import datetime
+
+import numpy as np
+
+from src.core.sample import (
+    DEFAULT_MAX_CELLS, NO_PACK, PackInfo, make_sample_dtype, dtype_max_cells, samples_to_array
+)
+
+# Session files are a fixed header (magic, version, cell slots, record size,
+# then the pack's port, serial and gauge type) followed by packed sample
+# records (see make_sample_dtype), appended in receive order. A session
+# holds one pack. Bump SESSION_VERSION whenever the layout changes.
+SESSION_MAGIC = b"AMPS"
+SESSION_VERSION = 3
+SESSION_EXT = ".amps"
+_HEADER = struct.Struct("<4sHHI4x")
+HEADER_SIZE = _HEADER.size + PackInfo.SIZE
+
+
+def session_filename(when=None):
+    """Default file name for a new session recording."""
+    when = when or datetime.datetime.now()
+    return f"Amplyze_Session_{when.strftime('%Y-%m-%d_%H-%M-%S')}{SESSION_EXT}"
+
+
+def new_session_path(sessions_dir, when=None):
+    """Path for a new recording in sessions_dir that does not overwrite an existing one."""
+    base = session_filename(when)[:-len(SESSION_EXT)]
+    path = os.path.join(sessions_dir, base + SESSION_EXT)
+    n = 2
+    while os.path.exists(path):
+        path = os.path.join(sessions_dir, f"{base}_{n}{SESSION_EXT}")
+        n += 1
+    return path
+
+
+def read_header(path):
+    """Return (version, max_cells, pack) for a session file."""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < _HEADER.size:
+        raise ValueError(f"Truncated session file: {path}")
+    magic, version, max_cells, record_size = _HEADER.unpack_from(raw)
+    if magic != SESSION_MAGIC:
+        raise ValueError(f"Not an Amplyze session file: {path}")
+    if version != SESSION_VERSION:
+        raise ValueError(f"Unsupported session version {version}: {path}")
+    if record_size != make_sample_dtype(max_cells).itemsize:
+        raise ValueError(f"Session record size {record_size} does not match this version: {path}")
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"Truncated session file: {path}")
+    return version, max_cells, PackInfo.from_bytes(raw[_HEADER.size:])
+
+
+class SessionWriter:
+    """Append BMS samples from one pack to a session file as they are read."""
+
+    def __init__(self, path, max_cells=DEFAULT_MAX_CELLS, pack=NO_PACK):
+        self.path = path
+        self.pack = pack
+        self.dtype = make_sample_dtype(max_cells)
+        self.count = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, "wb")
+        self._f.write(_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, max_cells, self.dtype.itemsize))
+        self._f.write(pack.to_bytes())
+        self._f.flush()
+
+    @property
+    def max_cells(self):
+        return dtype_max_cells(self.dtype)
+
+    def append(self, sample):
+        """Append one sample; raises ValueError if it is from another pack
+        or has more cells than max_cells."""
+        if not self.pack.matches(sample):
+            raise ValueError("Sample is from a different pack than the session")
+        self._f.write(samples_to_array([sample], self.dtype).tobytes())
+        self._f.flush()
+        self.count += 1
+
+    def append_array(self, arr):
+        """Append a block of records (must use this writer's dtype)."""
+        if arr.dtype != self.dtype:
+            raise ValueError("Sample array dtype does not match session")
+        self._f.write(np.ascontiguousarray(arr).tobytes())
+        self._f.flush()
+        self.count += len(arr)
+
+    @property
+    def closed(self):
+        return self._f.closed
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionReader:
+    """Read-only, memory-mapped view of a recorded session."""
+
+    def __init__(self, path):
+        self.path = path
+        _, max_cells, self.pack = read_header(path)
+        self.dtype = make_sample_dtype(max_cells)
+
+        n = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if n > 0:
+            self.samples = np.memmap(path, dtype=self.dtype, mode="r",
+                                     offset=HEADER_SIZE, shape=(n,))
+        else:
+            self.samples = np.zeros(0, dtype=self.dtype)
+
+    @property
+    def max_cells(self):
+        return dtype_max_cells(self.dtype)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def start_ts(self):
+        return float(self.samples["recv_ts"][0]) if len(self.samples) else None
+
+    @property
+    def end_ts(self):
+        return float(self.samples["recv_ts"][-1]) if len(self.samples) else None
+
+    def index_at(self, ts, side="left"):
+        """Index of the first sample received at or after `ts` (after, for side="right").
+
+        Records are appended in receive order, so the recv_ts column is the
+        time index; the binary search only touches O(log n) pages.
+        """
+        return int(np.searchsorted(self.samples["recv_ts"], ts, side=side))
+
+    def read(self, start, stop):
+        """Copy records [start, stop) out of the file."""
+        return np.array(self.samples[start:stop])
+
+    def close(self):
+        mm = getattr(self.samples, "_mmap", None)
+        self.samples = np.zeros(0, dtype=self.dtype)
+        if mm is not None:
+            mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
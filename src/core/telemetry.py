@@ -0,0 +1,305 @@
+import os
+import socket
+import struct
+import threading
+from collections import deque
+
+import numpy as np
+
+from src.core.sample import (
+    NO_PACK, PackInfo, make_sample_dtype, dtype_max_cells, samples_to_array, iter_samples
+)
+
+# Wire format: the server sends a hello (magic, version) on connect, then
+# messages of a u32 body length, a one-byte kind and the body. A layout
+# message (cell slots, record size, then the pack's port, serial and gauge
+# type) describes the records that follow it; a data message holds one or
+# more packed sample records (see make_sample_dtype). Records carry exactly
+# the pack's cells, and a new layout is sent ahead of the first record
+# whenever the pack or its cell count changes. Queued samples with the same layout are coalesced into one data
+# message. Bump TELEMETRY_VERSION when the wire format changes.
+TELEMETRY_MAGIC = b"AMPT"
+TELEMETRY_VERSION = 4
+DEFAULT_TELEMETRY_PORT = 8765
+DEFAULT_QUEUE_SIZE = 256
+MSG_LAYOUT = 1
+MSG_DATA = 2
+_HELLO = struct.Struct("<4sH2x")
+_MSG = struct.Struct("<IB")
+_LAYOUT = struct.Struct("<HI")
+
+
+def _message(kind, body):
+    return _MSG.pack(len(body), kind) + body
+
+
+def _layout_message(dtype, pack):
+    return _message(MSG_LAYOUT, _LAYOUT.pack(dtype_max_cells(dtype), dtype.itemsize) + pack.to_bytes())
+
+
+class _Subscriber:
+    """One connected client with its own bounded, drop-oldest queue."""
+
+    def __init__(self, sock, queue_size):
+        self.sock = sock
+        self.queue = deque(maxlen=queue_size)
+        self.wakeup = threading.Event()
+        self.alive = True
+        self.dropped = 0
+        self.thread = None
+
+    def offer(self, layout, records):
+        # Each entry carries its layout message, so dropping old entries
+        # never leaves the client decoding records with the wrong layout.
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append((layout, records))
+        self.wakeup.set()
+
+    def run(self, on_exit):
+        layout = None
+        try:
+            while self.alive:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                out, chunks = [], []
+                while self.queue:
+                    entry_layout, records = self.queue.popleft()
+                    if entry_layout != layout:
+                        if chunks:
+                            out.append(_message(MSG_DATA, b"".join(chunks)))
+                            chunks = []
+                        out.append(entry_layout)
+                        layout = entry_layout
+                    chunks.append(records)
+                if chunks:
+                    out.append(_message(MSG_DATA, b"".join(chunks)))
+                if out:
+                    self.sock.sendall(b"".join(out))
+        except OSError:
+            pass
+        finally:
+            self.alive = False
+            on_exit(self)
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+
+    def stop(self):
+        self.alive = False
+        self.wakeup.set()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class TelemetryServer:
+    """Fan live BMS samples out to any number of local subscribers.
+
+    publish() only encodes the sample once and appends it to each client's
+    queue; all socket I/O happens on per-client threads, so a slow or stuck
+    subscriber loses its oldest samples instead of blocking acquisition.
+    Binds to localhost by default, or to a Unix socket when unix_path is set.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_TELEMETRY_PORT, unix_path=None,
+                 queue_size=DEFAULT_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.queue_size = queue_size
+        self.address = None
+        # (pack and cell count, dtype, layout message) of the last published sample
+        self._layout = None
+
+        self._sock = None
+        self._accept_thread = None
+        self._clients = []
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        """Start listening and return the bound address."""
+        if self._running:
+            return self.address
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self.unix_path)
+            self.address = self.unix_path
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))
+            self.address = sock.getsockname()
+        sock.listen()
+        self._sock = sock
+        self._running = True
+        self._accept_thread = threading.Thread(target=self._accept_loop, args=(sock,),
+                                               name="telemetry-accept", daemon=True)
+        self._accept_thread.start()
+        return self.address
+
+    def stop(self):
+        self._running = False
+        if self._sock is not None:
+            # shutdown() wakes the accept() blocked in the listener thread;
+            # close() alone does not on Linux and would keep the port bound.
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        with self._lock:
+            clients = list(self._clients)
+            self._clients.clear()
+        for client in clients:
+            client.stop()
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout=1)
+            self._accept_thread = None
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.remove(self.unix_path)
+
+    def is_running(self):
+        return self._running
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    @property
+    def dropped(self):
+        """Samples dropped across currently connected clients."""
+        with self._lock:
+            return sum(c.dropped for c in self._clients)
+
+    def publish(self, sample):
+        """Queue one BMSSample for every subscriber. Never blocks on I/O."""
+        if self._running and self._clients:
+            key = (sample.port, sample.serial, sample.gauge_type, len(sample.cells))
+            layout = self._layout
+            if layout is None or layout[0] != key:
+                dtype = make_sample_dtype(len(sample.cells))
+                layout = self._layout = (key, dtype, _layout_message(dtype, PackInfo.of(sample)))
+            self._offer(layout[2], samples_to_array([sample], layout[1]).tobytes())
+
+    def publish_array(self, arr, pack=NO_PACK):
+        """Queue a block of packed sample records (any sample dtype) from `pack` for every subscriber."""
+        if arr.dtype != make_sample_dtype(dtype_max_cells(arr.dtype)):
+            raise ValueError("Not a sample array")
+        if self._running and self._clients and len(arr):
+            self._offer(_layout_message(arr.dtype, pack), np.ascontiguousarray(arr).tobytes())
+
+    def _offer(self, layout, records):
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.offer(layout, records)
+
+    def _accept_loop(self, sock):
+        hello = _HELLO.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION)
+        while self._running:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                break
+            try:
+                if conn.family != socket.AF_UNIX:
+                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                conn.sendall(hello)
+            except OSError:
+                conn.close()
+                continue
+            client = _Subscriber(conn, self.queue_size)
+            client.thread = threading.Thread(target=client.run, args=(self._remove,),
+                                             name="telemetry-client", daemon=True)
+            with self._lock:
+                self._clients.append(client)
+            client.thread.start()
+
+    def _remove(self, client):
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+
+class TelemetryClient:
+    """Subscriber for a TelemetryServer stream."""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_TELEMETRY_PORT, unix_path=None, timeout=None):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        magic, version = _HELLO.unpack(self._recv_exact(_HELLO.size))
+        if magic != TELEMETRY_MAGIC:
+            raise ValueError("Not an Amplyze telemetry stream")
+        if version != TELEMETRY_VERSION:
+            raise ValueError(f"Unsupported telemetry version {version}")
+        # Set by the first layout message
+        self.dtype = None
+        self.pack = NO_PACK
+
+    def _recv_exact(self, n):
+        buf = bytearray(n)
+        view = memoryview(buf)
+        got = 0
+        while got < n:
+            k = self.sock.recv_into(view[got:])
+            if k == 0:
+                raise ConnectionError("Telemetry server closed the connection")
+            got += k
+        return buf
+
+    def read_block(self):
+        """Return the next data message as a sample array (one or more records).
+
+        Layout messages are applied as they arrive, so the array's dtype
+        follows the pack's cell count and self.pack names the pack it came
+        from.
+        """
+        while True:
+            length, kind = _MSG.unpack(self._recv_exact(_MSG.size))
+            body = self._recv_exact(length)
+            if kind == MSG_LAYOUT:
+                max_cells, record_size = _LAYOUT.unpack_from(body)
+                dtype = make_sample_dtype(max_cells)
+                if record_size != dtype.itemsize:
+                    raise ValueError(f"Telemetry record size {record_size} does not match this version")
+                self.dtype = dtype
+                self.pack = PackInfo.from_bytes(body[_LAYOUT.size:])
+            elif kind == MSG_DATA:
+                if self.dtype is None:
+                    raise ValueError("Telemetry data received before a layout")
+                return np.frombuffer(body, dtype=self.dtype)
+
+    def samples(self):
+        """Yield BMSSample objects until the server disconnects."""
+        try:
+            while True:
+                yield from iter_samples(self.read_block(), self.pack)
+        except ConnectionError:
+            return
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
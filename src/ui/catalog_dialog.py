@@ -0,0 +1,97 @@
+import os
+import time
+import datetime
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
+    QSpinBox, QCheckBox, QTableWidget, QTableWidgetItem, QHeaderView
+)
+
+
+class CatalogDialog(QDialog):
+    """Search indexed sessions without opening any session files or PDFs."""
+
+    COLUMNS = ["Start", "Serial", "Port", "Gauge", "Status", "Delta (mV)",
+               "Min (mV)", "Max (mV)", "Alarms", "Samples", "File"]
+
+    def __init__(self, catalog, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.setWindowTitle("Session Catalog")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout()
+        filters = QHBoxLayout()
+
+        filters.addWidget(QLabel("Serial:"))
+        self.serial_edit = QLineEdit()
+        self.serial_edit.setMaximumWidth(120)
+        filters.addWidget(self.serial_edit)
+
+        filters.addWidget(QLabel("Port:"))
+        self.port_edit = QLineEdit()
+        self.port_edit.setMaximumWidth(120)
+        filters.addWidget(self.port_edit)
+
+        filters.addWidget(QLabel("Delta above (mV):"))
+        self.delta_spin = QSpinBox()
+        self.delta_spin.setRange(0, 5000)
+        filters.addWidget(self.delta_spin)
+
+        filters.addWidget(QLabel("Last days:"))
+        self.days_spin = QSpinBox()
+        self.days_spin.setRange(0, 3650)
+        self.days_spin.setValue(7)
+        self.days_spin.setToolTip("0 = all time")
+        filters.addWidget(self.days_spin)
+
+        self.failed_only = QCheckBox("Failed only")
+        filters.addWidget(self.failed_only)
+
+        self.btn_search = QPushButton("Search")
+        self.btn_search.clicked.connect(self.run_query)
+        filters.addWidget(self.btn_search)
+        filters.addStretch()
+        layout.addLayout(filters)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setAlternatingRowColors(True)
+        layout.addWidget(self.table)
+
+        self.result_label = QLabel("")
+        self.result_label.setStyleSheet('color: #666; font-style: italic;')
+        layout.addWidget(self.result_label)
+
+        self.setLayout(layout)
+        self.run_query()
+
+    def run_query(self):
+        days = self.days_spin.value()
+        t = time.perf_counter()
+        rows = self.catalog.query(
+            limit=1000,
+            pack_serial=self.serial_edit.text().strip() or None,
+            port=self.port_edit.text().strip() or None,
+            delta_above_mv=self.delta_spin.value() or None,
+            since=time.time() - days * 86400 if days else None,
+            passed=False if self.failed_only.isChecked() else None,
+        )
+        elapsed_ms = (time.perf_counter() - t) * 1000
+
+        self.table.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            values = [
+                datetime.datetime.fromtimestamp(r["start_ts"]).strftime("%Y-%m-%d %H:%M"),
+                r["pack_serial"] or "---",
+                r["port"] or "---",
+                r["gauge_type"] or "---",
+                "PASS" if r["passed"] else "FAIL",
+                r["max_delta_mv"], r["min_cell_mv"], r["max_cell_mv"],
+                r["safety_alarms"] + r["pf_alarms"], r["n_samples"],
+                os.path.basename(r["path"]),
+            ]
+            for j, v in enumerate(values):
+                self.table.setItem(i, j, QTableWidgetItem("---" if v is None else str(v)))
+        self.result_label.setText(f"{len(rows)} session(s) in {elapsed_ms:.1f} ms")
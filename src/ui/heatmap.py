@@ -0,0 +1,89 @@
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.ticker import MaxNLocator
+
+# Colour range either side of the pack mean, in mV. Cells further out than
+# this are drawn in the over/under colours, so outliers stand out without
+# any extra per-frame work.
+DEFAULT_SPAN_MV = 50
+DEFAULT_HISTORY = 300
+
+
+class CellHeatmap:
+    """Cell-voltage heatmap drawn with a single persistent image artist.
+
+    Values are stored as deviation from the pack mean (mV) on a fixed,
+    symmetric colour scale. Updates write into the image's own data buffer
+    and mark it changed; no artists are created after construction.
+
+    Two layouts are supported:
+      * time mode  - rows are cells, columns are the last `history` samples
+        (push / push_block)
+      * fleet mode - rows are packs, columns are cells (set_matrix)
+    """
+
+    def __init__(self, ax, n_rows, n_cols, span_mv=DEFAULT_SPAN_MV, row_label="Cell #",
+                 col_label="Sample"):
+        self.ax = ax
+        self.span_mv = span_mv
+
+        cmap = colormaps["RdBu_r"].copy()
+        cmap.set_over("#ff00ff")
+        cmap.set_under("#000000")
+
+        self.image = ax.imshow(
+            np.zeros((n_rows, n_cols), dtype=np.float32),
+            cmap=cmap, vmin=-span_mv, vmax=span_mv,
+            aspect="auto", interpolation="nearest", origin="lower",
+            extent=(-0.5, n_cols - 0.5, 0.5, n_rows + 0.5),
+        )
+        self._buf = self.image.get_array().data
+        ax.set_ylabel(row_label, fontsize=8)
+        ax.set_xlabel(col_label, fontsize=8)
+        ax.yaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
+        ax.tick_params(labelsize=8)
+
+    @classmethod
+    def for_cells(cls, ax, n_cells, history=DEFAULT_HISTORY, span_mv=DEFAULT_SPAN_MV):
+        """Cells x time view for a single pack."""
+        return cls(ax, n_cells, history, span_mv)
+
+    @classmethod
+    def for_fleet(cls, ax, n_packs, n_cells, span_mv=DEFAULT_SPAN_MV):
+        """Packs x cells view for many packs at once."""
+        return cls(ax, n_packs, n_cells, span_mv, row_label="Pack #", col_label="Cell #")
+
+    @property
+    def shape(self):
+        return self._buf.shape
+
+    def push(self, cells):
+        """Append one sample's cell voltages as the newest column."""
+        buf = self._buf
+        col = np.asarray(cells, dtype=np.float32)[:buf.shape[0]]
+        buf[:, :-1] = buf[:, 1:]
+        buf[:len(col), -1] = col - col.mean()
+        self.image.changed()
+
+    def push_block(self, cells):
+        """Append many samples at once; `cells` is (n_samples, n_cells)."""
+        buf = self._buf
+        block = np.asarray(cells, dtype=np.float32)[-buf.shape[1]:, :buf.shape[0]]
+        k = len(block)
+        if k == 0:
+            return
+        buf[:, :-k] = buf[:, k:]
+        buf[:block.shape[1], -k:] = (block - block.mean(axis=1, keepdims=True)).T
+        self.image.changed()
+
+    def set_matrix(self, matrix):
+        """Replace the whole view; `matrix` is (n_packs, n_cells) in mV."""
+        buf = self._buf
+        m = np.asarray(matrix, dtype=np.float32)[:buf.shape[0], :buf.shape[1]]
+        buf[:len(m), :m.shape[1]] = m - m.mean(axis=1, keepdims=True)
+        self.image.changed()
+
+    def clear(self):
+        self._buf[:] = 0
+        self.image.changed()
@@ -6,23 +6,82 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QComboBox, QCheckBox, QGroupBox, QFormLayout, QTableWidget, 
     QTableWidgetItem, QHeaderView, QMessageBox, QFileDialog, 
-    QMenuBar, QAction, QDialog, QSizePolicy
+    QMenuBar, QAction, QDialog, QSizePolicy, QSlider, QProgressDialog
 )
 from PyQt5.QtGui import QIcon, QPixmap, QPainter
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
 
 from src.core.bms import BMSManager
+from src.core.catalog import Catalog, default_catalog_path
+from src.core.replay import SessionReplay, REPLAY_SPEEDS
+from src.core.sample import BMSSample, PackInfo
+from src.core.session import SessionWriter, new_session_path
+from src.core.telemetry import TelemetryServer
+from src.ui.catalog_dialog import CatalogDialog
+from src.ui.heatmap import CellHeatmap
 from src.utils.constants import APP_STYLE
 from src.utils.report_generator import generate_pdf_report
+from src.utils.fleet_report import build_fleet, generate_fleet_report
+
+# Replay timer interval (ms); due samples are delivered in one block per tick
+REPLAY_TICK_MS = 50
+
+# In "Auto" plot mode, packs with more cells than this use the heatmap
+HEATMAP_AUTO_CELLS = 32
+
+class FleetReportWorker(QThread):
+    """Builds and writes a fleet report off the GUI thread.
+
+    cancel() stops aggregation after the current session; once the PDF is
+    being written it is finished, so a cancelled report is never half-written.
+    """
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(bool, int)
+
+    def __init__(self, paths, save_path, logo_path, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.save_path = save_path
+        self.logo_path = logo_path
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _progress(self, done, total):
+        self.progress.emit(done, total)
+        return not self.cancelled
+
+    def run(self):
+        try:
+            fleet = build_fleet(self.paths, progress=self._progress)
+            if fleet is None:
+                self.done.emit(False, 0)
+                return
+            ok = generate_fleet_report(self.save_path, fleet, self.logo_path)
+            self.done.emit(ok, len(fleet))
+        except Exception as e:
+            print(f"Error building fleet report: {e}")
+            self.done.emit(False, 0)
 
 class BMSGUIMain(QWidget):
     def __init__(self):
         super().__init__()
         self.bms_manager = BMSManager()
-        self.data_cache = {}
+        self.data_cache = None
+        self.session_writer = None
+        self.fleet_worker = None
+        self.telemetry_server = None
+        self.heatmap = None
+        self.heatmap_cbar = None
+        self.replay = None
+        self.replay_timer = QTimer(self)
+        self.replay_timer.setInterval(REPLAY_TICK_MS)
+        self.replay_timer.timeout.connect(self.replay_tick)
         
         self.setWindowTitle("Amplyze - BMS Analyzer")
         self.setGeometry(100, 100, 1100, 800)
@@ -40,9 +99,18 @@ class BMSGUIMain(QWidget):
         self.project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
         self.assets_dir = os.path.join(self.project_root, "assets")
         self.reports_dir = os.path.join(self.project_root, "reports")
+        self.sessions_dir = os.path.join(self.project_root, "sessions")
         
         os.makedirs(self.reports_dir, exist_ok=True)
         
+        # Session/report catalog; picks up anything recorded while closed
+        try:
+            self.catalog = Catalog(default_catalog_path(self.project_root))
+            self.catalog.scan(self.sessions_dir, self.reports_dir)
+        except Exception as e:
+            print(f"Catalog unavailable: {e}")
+            self.catalog = None
+        
         # Set window icon
         icon_path = os.path.join(self.assets_dir, "icons", "amplyze_64.png")
         if os.path.exists(icon_path):
@@ -56,6 +124,19 @@ class BMSGUIMain(QWidget):
         # Menu
         menubar = QMenuBar()
         file_menu = menubar.addMenu('File')
+        self.share_action = QAction('Share Live Data (localhost)', self)
+        self.share_action.setCheckable(True)
+        self.share_action.toggled.connect(self.toggle_telemetry)
+        file_menu.addAction(self.share_action)
+        catalog_action = QAction('Search Sessions...', self)
+        catalog_action.triggered.connect(self.show_catalog)
+        file_menu.addAction(catalog_action)
+        replay_action = QAction('Replay Session...', self)
+        replay_action.triggered.connect(self.open_replay)
+        file_menu.addAction(replay_action)
+        fleet_action = QAction('Fleet Report...', self)
+        fleet_action.triggered.connect(self.save_fleet_report)
+        file_menu.addAction(fleet_action)
         exit_action = QAction('Exit', self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -64,6 +145,7 @@ class BMSGUIMain(QWidget):
         about_action = QAction('About', self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
+        main_layout.setMenuBar(menubar)
         
         # Controls Group
         control_layout = QHBoxLayout()
@@ -90,6 +172,7 @@ class BMSGUIMain(QWidget):
         
         self.simulation_mode = QCheckBox("Simulation Mode")
         self.simulation_mode.setToolTip('Toggle simulated data')
+        self.simulation_mode.toggled.connect(self.toggle_simulation)
         control_layout.addWidget(self.simulation_mode)
         
         main_layout.addLayout(control_layout)
@@ -112,6 +195,34 @@ class BMSGUIMain(QWidget):
         
         main_layout.addLayout(header_layout)
         
+        # Replay controls (shown while a recorded session is loaded)
+        self.replay_bar = QWidget()
+        replay_layout = QHBoxLayout()
+        replay_layout.setContentsMargins(0, 0, 0, 0)
+        replay_layout.addWidget(QLabel("Replay:"))
+        self.btn_replay_play = QPushButton("Pause")
+        self.btn_replay_play.setObjectName('ghost')
+        self.btn_replay_play.clicked.connect(self.toggle_replay_play)
+        replay_layout.addWidget(self.btn_replay_play)
+        self.replay_speed = QComboBox()
+        self.replay_speed.addItems([f"{s}x" for s in REPLAY_SPEEDS])
+        self.replay_speed.currentIndexChanged.connect(self.change_replay_speed)
+        replay_layout.addWidget(self.replay_speed)
+        self.replay_slider = QSlider(Qt.Horizontal)
+        # valueChanged also covers clicks and paging on the groove; the
+        # programmatic updates in replay_tick block signals
+        self.replay_slider.valueChanged.connect(self.seek_replay)
+        replay_layout.addWidget(self.replay_slider, 1)
+        self.replay_pos_label = QLabel("")
+        replay_layout.addWidget(self.replay_pos_label)
+        self.btn_replay_stop = QPushButton("Stop")
+        self.btn_replay_stop.setObjectName('ghost')
+        self.btn_replay_stop.clicked.connect(self.stop_replay)
+        replay_layout.addWidget(self.btn_replay_stop)
+        self.replay_bar.setLayout(replay_layout)
+        self.replay_bar.setVisible(False)
+        main_layout.addWidget(self.replay_bar)
+        
         # Data Summary
         summary = QGroupBox("Battery Summary")
         form = QFormLayout()
@@ -153,6 +264,15 @@ class BMSGUIMain(QWidget):
         # Embedded Plot (Right)
         plot_group = QGroupBox("Voltage Analysis")
         plot_layout = QVBoxLayout()
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("View:"))
+        self.plot_mode = QComboBox()
+        self.plot_mode.addItems(["Auto", "Cell Profile", "Heatmap"])
+        self.plot_mode.setToolTip('Heatmap shows cells x time as deviation from the pack mean')
+        self.plot_mode.currentIndexChanged.connect(self.change_plot_mode)
+        mode_layout.addWidget(self.plot_mode)
+        mode_layout.addStretch()
+        plot_layout.addLayout(mode_layout)
         self.figure = Figure(figsize=(5, 3), dpi=100)
         self.canvas = FigureCanvas(self.figure)
         self.ax = self.figure.add_subplot(111)
@@ -181,6 +301,7 @@ class BMSGUIMain(QWidget):
 
     def toggle_connection(self):
         if self.bms_manager.is_connected():
+            self.close_session()
             self.bms_manager.disconnect()
             self.btn_connect.setText("Connect")
             self.status_label.setText("Status: Disconnected")
@@ -206,44 +327,159 @@ class BMSGUIMain(QWidget):
             else:
                 data = self.bms_manager.read_data(simulation_mode=False)
             
-            self.data_cache = data # Store for plotting/reporting
-            
-            # Update labels with .get() for robustness
-            self.labels["Pack Voltage (mV)"].setText(str(data.get("PackVoltage_mV", "---")))
-            self.labels["Current (mA)"].setText(str(data.get("Current_mA", "---")))
-            self.labels["Temperature (C)"].setText(str(data.get("Temperature_C", "---")))
-            self.labels["Cycle Count"].setText(str(data.get("CycleCount", "---")))
-            self.labels["Gauge Type"].setText(str(data.get("GaugeType", "Unknown")))
-            self.labels["Remain Capacity (mAh)"].setText(str(data.get("RemainCapacity_mAh", "---")))
-            self.labels["Full Capacity (mAh)"].setText(str(data.get("FullCapacity_mAh", "---")))
-
-            
-            # Decode statuses (default to 0 if missing)
-            s_status = self.bms_manager.decode_safety_status(int(data.get("SafetyStatus", 0)))
-            pf_status = self.bms_manager.decode_pf_status(int(data.get("PF_Status", 0)))
-            
-            self.labels["Safety Status"].setText(s_status)
-            self.labels["PF Status"].setText(pf_status)
-            
-            # Store formatted strings for report
-            self.data_cache['SafetyStatusStr'] = s_status
-            self.data_cache['PFStatusStr'] = pf_status
-            
-            # Update Table
-            cells = data.get("Cells", [])
-            self.cell_table.setRowCount(len(cells))
-            for i, v in enumerate(cells):
-                self.cell_table.setItem(i, 0, QTableWidgetItem(str(i+1)))
-                self.cell_table.setItem(i, 1, QTableWidgetItem(str(v)))
-
-            # Update embedded plot
-            self.update_plot()
+            self.record_sample(data)
+            self.show_sample(data)
             
         except Exception as e:
             QMessageBox.warning(self, "Read Error", str(e))
 
-    def update_plot(self):
-        cells = self.data_cache.get("Cells", [])
+    def show_sample(self, data, cells_block=None):
+        """Display a sample. cells_block optionally carries the cell history
+        (n_samples x n_cells) that led up to it, e.g. during replay."""
+        self.data_cache = data # Store for plotting/reporting
+        # Update labels
+        self.labels["Pack Voltage (mV)"].setText(str(data.pack_voltage_mv))
+        self.labels["Current (mA)"].setText(str(data.current_ma))
+        self.labels["Temperature (C)"].setText(str(data.temperature_c))
+        self.labels["Cycle Count"].setText(str(data.cycle_count))
+        self.labels["Gauge Type"].setText(data.gauge_type or "Unknown")
+        self.labels["Remain Capacity (mAh)"].setText(str(data.remain_capacity_mah))
+        self.labels["Full Capacity (mAh)"].setText(str(data.full_capacity_mah))
+        
+        # Decoded statuses
+        self.labels["Safety Status"].setText(data.safety_status_str)
+        self.labels["PF Status"].setText(data.pf_status_str)
+        
+        # Update Table
+        cells = data.cells
+        self.cell_table.setRowCount(len(cells))
+        for i, v in enumerate(cells):
+            self.cell_table.setItem(i, 0, QTableWidgetItem(str(i+1)))
+            self.cell_table.setItem(i, 1, QTableWidgetItem(str(v)))
+
+        # Update embedded plot
+        self.update_plot(cells_block)
+
+    def record_sample(self, sample):
+        """Append a sample to the current session recording, opening one if needed.
+
+        A new session is started when the pack (port, serial or gauge) changes,
+        so each recording covers one pack, and when the sample does not fit the
+        current recording's cell slots, so cells are never truncated. Records
+        are sized to the pack's own cell count.
+        """
+        try:
+            if self.session_writer is not None and (
+                    not self.session_writer.pack.matches(sample)
+                    or len(sample.cells) > self.session_writer.max_cells):
+                self.close_session()
+            if self.session_writer is None:
+                path = new_session_path(self.sessions_dir)
+                self.session_writer = SessionWriter(path, max_cells=len(sample.cells),
+                                                    pack=PackInfo.of(sample))
+            self.session_writer.append(sample)
+        except (OSError, ValueError) as e:
+            self.status_label.setText(f"Status: Session recording failed ({e})")
+
+    def close_session(self):
+        if self.session_writer is not None:
+            self.session_writer.close()
+            if self.catalog is not None:
+                try:
+                    self.catalog.index_session(self.session_writer.path)
+                except Exception as e:
+                    print(f"Failed to index session: {e}")
+            self.session_writer = None
+
+    def toggle_simulation(self, enabled):
+        # Simulated and real reads never share a session; each simulation
+        # run is one simulated pack
+        self.close_session()
+        self.bms_manager.reset_simulation()
+
+    def show_catalog(self):
+        if self.catalog is None:
+            QMessageBox.warning(self, "Catalog", "Session catalog is not available.")
+            return
+        CatalogDialog(self.catalog, self).exec_()
+
+    def toggle_telemetry(self, enabled):
+        """Start or stop the local fan-out server for live samples."""
+        if enabled and self.telemetry_server is None:
+            server = TelemetryServer()
+            try:
+                host, port = server.start()
+            except OSError as e:
+                QMessageBox.critical(self, "Telemetry Error", str(e))
+                self.share_action.setChecked(False)
+                return
+            self.telemetry_server = server
+            self.bms_manager.add_listener(server.publish)
+            self.status_label.setText(f"Status: Sharing live data on {host}:{port}")
+        elif not enabled and self.telemetry_server is not None:
+            self.bms_manager.remove_listener(self.telemetry_server.publish)
+            self.telemetry_server.stop()
+            self.telemetry_server = None
+            self.status_label.setText("Status: Live data sharing stopped")
+
+    def closeEvent(self, event):
+        if self.fleet_worker is not None:
+            # The worker is owned by this window and must not outlive it
+            self.fleet_worker.done.disconnect()
+            self.fleet_worker.cancel()
+            self.fleet_worker.wait()
+            self.fleet_worker = None
+        self.close_session()
+        self.stop_replay()
+        if self.telemetry_server is not None:
+            self.telemetry_server.stop()
+        if self.catalog is not None:
+            self.catalog.close()
+        super().closeEvent(event)
+
+    def use_heatmap(self, n_cells):
+        mode = self.plot_mode.currentText()
+        if mode == "Auto":
+            return n_cells > HEATMAP_AUTO_CELLS
+        return mode == "Heatmap" and n_cells > 0
+
+    def change_plot_mode(self):
+        # Redraw only; no new sample arrived, so nothing is pushed into an
+        # existing heatmap
+        self.update_plot(push=False)
+
+    def reset_heatmap(self):
+        if self.heatmap_cbar is not None:
+            self.heatmap_cbar.remove()
+        self.heatmap_cbar = None
+        self.heatmap = None
+
+    def update_heatmap(self, cells, cells_block=None, push=True):
+        """Push the latest cells (or a block of samples) into the persistent heatmap image.
+
+        A newly created heatmap is always seeded with the current sample.
+        """
+        created = self.heatmap is None or self.heatmap.shape[0] != len(cells)
+        if created:
+            self.reset_heatmap()
+            self.ax.clear()
+            self.heatmap = CellHeatmap.for_cells(self.ax, len(cells))
+            self.heatmap_cbar = self.figure.colorbar(self.heatmap.image, ax=self.ax, extend='both')
+            self.heatmap_cbar.set_label("mV vs pack mean", fontsize=8)
+            self.ax.set_title("Cell Voltage Heatmap", fontsize=10)
+        if cells_block is not None and push:
+            self.heatmap.push_block(cells_block)
+        elif push or created:
+            self.heatmap.push(cells)
+        self.canvas.draw_idle()
+
+    def update_plot(self, cells_block=None, push=True):
+        cells = self.data_cache.cells if self.data_cache else []
+        if self.use_heatmap(len(cells)):
+            self.update_heatmap(cells, cells_block, push)
+            return
+
+        self.reset_heatmap()
         self.ax.clear()
         
         if not cells:
@@ -256,7 +492,10 @@ class BMSGUIMain(QWidget):
             self.ax.set_xlabel("Cell #", fontsize=8)
             self.ax.set_ylabel("mV", fontsize=8)
             self.ax.grid(True, linestyle='--', alpha=0.6)
-            self.ax.set_xticks(x)
+            if len(cells) <= HEATMAP_AUTO_CELLS:
+                self.ax.set_xticks(x)
+            else:
+                self.ax.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
 
         self.canvas.draw()
 
@@ -278,10 +517,157 @@ class BMSGUIMain(QWidget):
         success = generate_pdf_report(save_path, self.data_cache, logo_path)
         
         if success:
+            if self.catalog is not None:
+                # During replay the shown sample comes from the replayed file
+                if self.replay is not None:
+                    session_path = self.replay.reader.path
+                elif self.session_writer is not None:
+                    session_path = self.session_writer.path
+                else:
+                    session_path = None
+                try:
+                    self.catalog.index_report(save_path, self.data_cache, session_path)
+                except Exception as e:
+                    print(f"Failed to index report: {e}")
             QMessageBox.information(self, "Success", f"Report saved to:\n{save_path}")
         else:
             QMessageBox.critical(self, "Error", "Failed to generate report.")
 
+    def save_fleet_report(self):
+        if self.fleet_worker is not None:
+            QMessageBox.warning(self, "Fleet Report", "A fleet report is already being generated.")
+            return
+
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select Sessions", self.sessions_dir,
+                                                "Amplyze Sessions (*.amps)")
+        if not paths:
+            return
+
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
+        default_path = os.path.join(self.reports_dir, f"Amplyze_Fleet_Report_{timestamp}.pdf")
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save Fleet Report", default_path, "PDF Files (*.pdf)")
+        if not save_path:
+            return
+
+        logo_path = os.path.join(self.assets_dir, "amplyze_logo.png")
+        progress = QProgressDialog("Aggregating sessions...", "Cancel", 0, len(paths), self)
+        progress.setWindowTitle("Fleet Report")
+        progress.setMinimumDuration(0)
+        # Stay open while the PDF is written after the last session
+        progress.setAutoReset(False)
+        progress.setAutoClose(False)
+        progress.setValue(0)
+
+        worker = FleetReportWorker(paths, save_path, logo_path, self)
+        progress.canceled.connect(worker.cancel)
+
+        def update(done, total):
+            progress.setValue(done)
+            if done == total:
+                progress.setLabelText("Writing PDF...")
+
+        def finished(ok, n_packs):
+            progress.close()
+            self.fleet_worker = None
+            if ok:
+                QMessageBox.information(self, "Success", f"Fleet report ({n_packs} packs) saved to:\n{save_path}")
+            elif worker.cancelled:
+                self.status_label.setText("Status: Fleet report cancelled")
+            else:
+                QMessageBox.critical(self, "Error", "Failed to generate fleet report.")
+
+        worker.progress.connect(update)
+        worker.done.connect(finished)
+        worker.finished.connect(worker.deleteLater)
+        self.fleet_worker = worker
+        worker.start()
+
+    def open_replay(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Replay Session", self.sessions_dir,
+                                              "Amplyze Sessions (*.amps)")
+        if not path:
+            return
+        self.stop_replay()
+        try:
+            replay = SessionReplay(path, speed=REPLAY_SPEEDS[self.replay_speed.currentIndex()])
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Replay Error", str(e))
+            return
+        if len(replay) == 0:
+            replay.close()
+            QMessageBox.warning(self, "Replay", "Session contains no samples.")
+            return
+
+        self.replay = replay
+        self.reset_heatmap()
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setRange(0, max(1, int(replay.end_ts - replay.start_ts)))
+        self.replay_slider.setValue(0)
+        self.replay_slider.blockSignals(False)
+        self.replay_bar.setVisible(True)
+        self.btn_read.setEnabled(False)
+        self.btn_replay_play.setText("Pause")
+        self.status_label.setText(f"Status: Replaying {os.path.basename(path)} ({len(replay)} samples)")
+        replay.play()
+        self.replay_timer.start()
+
+    def replay_tick(self):
+        """Deliver samples that became due since the last tick through show_sample."""
+        replay = self.replay
+        if replay is None:
+            return
+        block = replay.advance()
+        if len(block):
+            n = int(block["n_cells"][-1])
+            self.show_sample(BMSSample.from_record(block[-1], replay.reader.pack), block["cells"][:, :n])
+
+        elapsed = int(replay.current_ts() - replay.start_ts)
+        if not self.replay_slider.isSliderDown():
+            self.replay_slider.blockSignals(True)
+            self.replay_slider.setValue(elapsed)
+            self.replay_slider.blockSignals(False)
+        self.replay_pos_label.setText(f"{replay.position}/{len(replay)}  +{elapsed}s")
+        if replay.finished:
+            replay.pause()
+            self.replay_timer.stop()
+            self.btn_replay_play.setText("Play")
+
+    def toggle_replay_play(self):
+        if self.replay is None:
+            return
+        if self.replay.playing:
+            self.replay.pause()
+            self.replay_timer.stop()
+            self.btn_replay_play.setText("Play")
+        else:
+            if self.replay.finished:
+                self.replay.seek(self.replay.start_ts)
+            self.replay.play()
+            self.replay_timer.start()
+            self.btn_replay_play.setText("Pause")
+
+    def change_replay_speed(self, index):
+        if self.replay is not None:
+            self.replay.set_speed(REPLAY_SPEEDS[index])
+
+    def seek_replay(self, value):
+        if self.replay is not None:
+            self.replay.seek(self.replay.start_ts + value)
+            if self.heatmap is not None:
+                self.heatmap.clear()
+
+    def stop_replay(self):
+        self.replay_timer.stop()
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
+            # Drop the replayed sample and its heatmap columns (update_plot
+            # resets the heatmap) so they are not reported as live data
+            self.data_cache = None
+            self.update_plot(push=False)
+        self.replay_bar.setVisible(False)
+        self.btn_read.setEnabled(True)
+
     def show_about(self):
         QMessageBox.about(self, "About Amplyze", 
                           "Amplyze BMS Analyzer\n\nVersion: 2.0.0 (Modular)\n\nSupports Windows & Linux")
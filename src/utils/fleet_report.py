@@ -0,0 +1,395 @@
+import os
+import sys
+import datetime
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from matplotlib.figure import Figure
+
+from src.core.sample import (
+    SERIAL_LEN, PORT_LEN, SAFETY_ALARM_MASK, PF_ALARM_MASK, BMSSample,
+    make_sample_dtype, samples_to_array, cell_min_max
+)
+from src.core.session import SessionReader
+
+# One row per pack (session or snapshot); this is all the fleet report keeps
+# in memory, so a 10,000-pack lot needs about 1 MB regardless of session size.
+PACK_DTYPE = np.dtype([
+    ("serial", f"S{SERIAL_LEN}"),
+    ("port", f"S{PORT_LEN}"),
+    ("ts", "<f8"),
+    ("full_capacity_mah", "<i4"),
+    ("remain_capacity_mah", "<i4"),
+    ("cycle_count", "<u4"),
+    ("min_cell_mv", "<u2"),
+    ("max_cell_mv", "<u2"),
+    ("delta_mv", "<u2"),
+    ("max_temp_c", "<f4"),
+    ("safety_alarms", "<u4"),
+    ("pf_alarms", "<u4"),
+    ("samples", "<u4"),
+])
+
+# Records read from a session per step; bounds memory for long sessions
+SESSION_CHUNK = 65536
+WORST_PACKS = 25
+
+# (column, label, unit) for the distribution table and histograms
+DISTRIBUTIONS = (
+    ("full_capacity_mah", "Full Capacity", "mAh"),
+    ("cycle_count", "Cycle Count", ""),
+    ("delta_mv", "Cell Delta", "mV"),
+    ("max_temp_c", "Max Temperature", "°C"),
+)
+
+
+class FleetSummary:
+    """Accumulates one summary row per pack in a single streaming pass.
+
+    Sessions are reduced chunk by chunk; snapshot arrays are reduced with
+    column operations (one pack per row). Storage grows by doubling, so
+    adding N packs is linear.
+    """
+
+    def __init__(self, capacity=1024):
+        self._rows = np.zeros(capacity, dtype=PACK_DTYPE)
+        self.count = 0
+
+    @property
+    def packs(self):
+        return self._rows[:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, n):
+        need = self.count + n
+        if need > len(self._rows):
+            grown = np.zeros(max(need, 2 * len(self._rows)), dtype=PACK_DTYPE)
+            grown[:self.count] = self._rows[:self.count]
+            self._rows = grown
+        out = self._rows[self.count:need]
+        self.count = need
+        return out
+
+    def add_snapshots(self, arr):
+        """Add each record of a sample array as its own pack.
+
+        Records carry no pack identity, so serial and port are left blank;
+        add_samples fills them in from the samples. Returns the new rows.
+        """
+        lo, hi = cell_min_max(arr)
+        out = self._reserve(len(arr))
+        out["ts"] = arr["recv_ts"]
+        out["full_capacity_mah"] = arr["full_capacity_mah"]
+        out["remain_capacity_mah"] = arr["remain_capacity_mah"]
+        out["cycle_count"] = arr["cycle_count"]
+        out["min_cell_mv"] = lo
+        out["max_cell_mv"] = hi
+        out["delta_mv"] = hi - lo
+        out["max_temp_c"] = arr["temperature_c"]
+        out["safety_alarms"] = (arr["safety_status"] & SAFETY_ALARM_MASK) != 0
+        out["pf_alarms"] = (arr["pf_status"] & PF_ALARM_MASK) != 0
+        out["samples"] = 1
+        return out
+
+    def add_samples(self, samples):
+        """Add BMSSample objects or firmware dicts, one pack each."""
+        samples = [s if isinstance(s, BMSSample) else BMSSample.from_dict(s) for s in samples]
+        out = self.add_snapshots(samples_to_array(
+            samples, make_sample_dtype(max((len(s.cells) for s in samples), default=0))))
+        out["serial"] = [s.serial.encode() for s in samples]
+        out["port"] = [s.port.encode() for s in samples]
+
+    def add_session(self, path):
+        """Reduce a whole recorded session to one pack row."""
+        with SessionReader(path) as reader:
+            n = len(reader)
+            if n == 0:
+                return False
+            lo_min, hi_max, delta_max = 0xFFFF, 0, 0
+            temp_max = -np.inf
+            safety = pf = 0
+            for start in range(0, n, SESSION_CHUNK):
+                block = reader.samples[start:start + SESSION_CHUNK]
+                lo, hi = cell_min_max(block)
+                has_cells = block["n_cells"] > 0
+                if has_cells.any():
+                    lo_min = min(lo_min, int(lo[has_cells].min()))
+                    hi_max = max(hi_max, int(hi[has_cells].max()))
+                    delta_max = max(delta_max, int((hi - lo)[has_cells].max()))
+                temp_max = max(temp_max, float(block["temperature_c"].max()))
+                safety += int(np.count_nonzero(block["safety_status"] & SAFETY_ALARM_MASK))
+                pf += int(np.count_nonzero(block["pf_status"] & PF_ALARM_MASK))
+            last = reader.samples[n - 1]
+
+            row = self._reserve(1)[0]
+            row["serial"] = reader.pack.serial.encode()
+            row["port"] = reader.pack.port.encode()
+            row["ts"] = reader.samples["recv_ts"][0]
+            row["full_capacity_mah"] = last["full_capacity_mah"]
+            row["remain_capacity_mah"] = last["remain_capacity_mah"]
+            row["cycle_count"] = last["cycle_count"]
+            row["min_cell_mv"] = lo_min if hi_max else 0
+            row["max_cell_mv"] = hi_max
+            row["delta_mv"] = delta_max
+            row["max_temp_c"] = temp_max
+            row["safety_alarms"] = safety
+            row["pf_alarms"] = pf
+            row["samples"] = n
+        return True
+
+    def passed(self):
+        packs = self.packs
+        return (packs["safety_alarms"] == 0) & (packs["pf_alarms"] == 0)
+
+    def stats(self):
+        """Lot statistics: {column: (min, p5, median, mean, p95, max)}."""
+        packs = self.packs
+        out = {}
+        for col, _, _ in DISTRIBUTIONS:
+            v = packs[col].astype(np.float64)
+            if len(v):
+                p5, p50, p95 = np.percentile(v, [5, 50, 95])
+                out[col] = (v.min(), p5, p50, v.mean(), p95, v.max())
+        return out
+
+    def worst(self, n=WORST_PACKS):
+        """Worst packs: failed first, then by cell delta, then temperature."""
+        packs = self.packs
+        order = np.lexsort((-packs["max_temp_c"], -packs["delta_mv"].astype(np.int32), self.passed()))
+        return packs[order[:n]]
+
+
+def build_fleet(sources, progress=None):
+    """Build a FleetSummary from session paths, sample arrays or samples.
+
+    progress, if given, is called as progress(done, total) after each
+    source; total is None when sources has no length. If it returns False
+    the build stops and None is returned.
+    """
+    fleet = FleetSummary()
+    pending = []
+    total = len(sources) if hasattr(sources, "__len__") else None
+    for done, src in enumerate(sources, 1):
+        if isinstance(src, (str, os.PathLike)):
+            try:
+                fleet.add_session(src)
+            except (OSError, ValueError) as e:
+                print(f"Skipping session {src}: {e}")
+        elif isinstance(src, np.ndarray):
+            fleet.add_snapshots(src)
+        else:
+            pending.append(src)
+            if len(pending) >= SESSION_CHUNK:
+                fleet.add_samples(pending)
+                pending = []
+        if progress is not None and progress(done, total) is False:
+            return None
+    if pending:
+        fleet.add_samples(pending)
+    return fleet
+
+
+def generate_fleet_report(save_path, fleet, logo_path=None, title="FLEET SUMMARY REPORT"):
+    """
+    Generate a multi-page lot-level PDF for a FleetSummary.
+    """
+    if not len(fleet):
+        print("Error generating fleet PDF: no packs")
+        return False
+
+    plot_img_path = save_path.replace('.pdf', '_dist.png')
+    have_plot = _create_distribution_image(fleet, plot_img_path)
+
+    try:
+        doc = SimpleDocTemplate(save_path, pagesize=A4,
+                                rightMargin=10*mm, leftMargin=10*mm,
+                                topMargin=10*mm, bottomMargin=10*mm)
+        styles = getSampleStyleSheet()
+
+        style_title = ParagraphStyle(
+            'FleetTitle',
+            parent=styles['Heading1'],
+            fontSize=20,
+            leading=24,
+            textColor=colors.HexColor('#003045'),
+            alignment=1,
+            spaceAfter=5
+        )
+        style_subtitle = ParagraphStyle(
+            'FleetSubtitle',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.HexColor('#666666'),
+            alignment=1,
+            spaceAfter=10
+        )
+        style_section = ParagraphStyle(
+            'FleetSection',
+            parent=styles['Heading2'],
+            fontSize=12,
+            textColor=colors.HexColor('#007acc'),
+            spaceBefore=8,
+            spaceAfter=5
+        )
+        table_style = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#007acc')),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0,0), (-1,-1), 8),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
+            ('PADDING', (0,0), (-1,-1), 4),
+            ('BACKGROUND', (0,1), (-1,-1), colors.whitesmoke),
+        ])
+
+        packs = fleet.packs
+        passed = fleet.passed()
+        n = len(packs)
+        n_pass = int(passed.sum())
+
+        elements = []
+
+        # --- Header ---
+        if logo_path and os.path.exists(logo_path):
+            img = Image(logo_path, width=35*mm, height=35*mm, kind='proportional')
+            t = Table([[img, Paragraph(f"<b>{title}</b>", style_title)]], colWidths=[40*mm, 120*mm])
+            t.setStyle(TableStyle([
+                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ]))
+            elements.append(t)
+        else:
+            elements.append(Paragraph(title, style_title))
+
+        t0 = datetime.datetime.fromtimestamp(packs["ts"].min()).strftime('%d %B %Y %H:%M')
+        t1 = datetime.datetime.fromtimestamp(packs["ts"].max()).strftime('%d %B %Y %H:%M')
+        elements.append(Paragraph(f"Generated: {datetime.datetime.now().strftime('%d %B %Y - %H:%M:%S')}"
+                                  f"<br/>Tested: {t0} — {t1}", style_subtitle))
+
+        # --- Section 1: Yield ---
+        elements.append(Paragraph("Lot Yield", style_section))
+        yield_data = [
+            ['Packs Tested', 'Passed', 'Failed', 'Yield', 'Safety Alerts', 'Permanent Failures'],
+            [str(n), str(n_pass), str(n - n_pass), f"{100.0 * n_pass / n:.1f} %",
+             str(int(np.count_nonzero(packs["safety_alarms"]))),
+             str(int(np.count_nonzero(packs["pf_alarms"])))],
+        ]
+        t_yield = Table(yield_data, colWidths=[32*mm] * 6)
+        t_yield.setStyle(table_style)
+        elements.append(t_yield)
+        elements.append(Spacer(1, 5*mm))
+
+        # --- Section 2: Distributions ---
+        elements.append(Paragraph("Lot Statistics", style_section))
+        stats = fleet.stats()
+        stats_data = [['Parameter', 'Min', 'P5', 'Median', 'Mean', 'P95', 'Max']]
+        for col, label, unit in DISTRIBUTIONS:
+            if col in stats:
+                name = f"{label} ({unit})" if unit else label
+                stats_data.append([name] + [f"{v:.1f}" if col == "max_temp_c" else f"{v:.0f}"
+                                            for v in stats[col]])
+        t_stats = Table(stats_data, colWidths=[45*mm] + [24*mm] * 6)
+        t_stats.setStyle(table_style)
+        elements.append(t_stats)
+
+        if have_plot:
+            elements.append(Spacer(1, 5*mm))
+            elements.append(Image(plot_img_path, width=180*mm, height=120*mm))
+
+        # --- Section 3: Worst packs ---
+        elements.append(PageBreak())
+        worst = fleet.worst()
+        elements.append(Paragraph(f"Worst {len(worst)} Packs", style_section))
+        worst_data = [['#', 'Serial', 'Port', 'Tested', 'Status', 'Delta (mV)',
+                       'Min/Max (mV)', 'Max Temp', 'Capacity', 'Cycles']]
+        for i, p in enumerate(worst, 1):
+            ok = p["safety_alarms"] == 0 and p["pf_alarms"] == 0
+            worst_data.append([
+                str(i),
+                p["serial"].decode(errors="replace") or "---",
+                p["port"].decode(errors="replace") or "---",
+                datetime.datetime.fromtimestamp(p["ts"]).strftime('%d/%m %H:%M'),
+                "PASS" if ok else "FAIL",
+                str(p["delta_mv"]),
+                f"{p['min_cell_mv']}/{p['max_cell_mv']}",
+                f"{p['max_temp_c']:.1f} °C",
+                f"{p['full_capacity_mah']} mAh",
+                str(p["cycle_count"]),
+            ])
+        t_worst = Table(worst_data, colWidths=[8*mm, 26*mm, 26*mm, 20*mm, 14*mm, 18*mm,
+                                               22*mm, 18*mm, 22*mm, 14*mm], repeatRows=1)
+        style = TableStyle(table_style.getCommands())
+        for i, p in enumerate(worst, 1):
+            if p["safety_alarms"] or p["pf_alarms"]:
+                style.add('TEXTCOLOR', (4, i), (4, i), colors.red)
+        t_worst.setStyle(style)
+        elements.append(t_worst)
+
+        elements.append(Spacer(1, 8*mm))
+        elements.append(Paragraph("<i>End of Report - Generated by Amplyze</i>", style_subtitle))
+
+        doc.build(elements)
+
+        if os.path.exists(plot_img_path):
+            try:
+                os.remove(plot_img_path)
+            except OSError:
+                pass
+        return True
+    except Exception as e:
+        print(f"Error generating fleet PDF: {e}")
+        return False
+
+
+def _create_distribution_image(fleet, save_path):
+    try:
+        packs = fleet.packs
+        passed = fleet.passed()
+        # Plain Figure rather than pyplot, so this is safe off the GUI thread
+        fig = Figure(figsize=(9, 6), dpi=150)
+        axes = fig.subplots(2, 2)
+        for ax, (col, label, unit) in zip(axes.flat, DISTRIBUTIONS):
+            v = packs[col].astype(np.float64)
+            bins = np.histogram_bin_edges(v, bins=min(40, max(5, len(v) // 10)))
+            ax.hist([v[passed], v[~passed]], bins=bins, stacked=True,
+                    color=['#007acc', '#ff6b6b'], label=['Pass', 'Fail'])
+            ax.set_title(label, fontsize=10, fontweight='bold', color='#333')
+            ax.set_xlabel(unit, fontsize=8)
+            ax.tick_params(labelsize=7)
+            ax.grid(axis='y', linestyle='--', alpha=0.5)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+        axes.flat[0].legend(fontsize=7)
+        fig.tight_layout()
+        fig.savefig(save_path, bbox_inches='tight')
+        return True
+    except Exception as e:
+        print(f"Error plotting distributions: {e}")
+        return False
+
+
+def main(argv=None):
+    """Build a fleet report from recorded sessions, e.g.
+
+        python -m src.utils.fleet_report sessions/*.amps -o reports/lot.pdf
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate an Amplyze fleet summary report.")
+    parser.add_argument("sessions", nargs="+")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--logo")
+    args = parser.parse_args(argv)
+
+    fleet = build_fleet(args.sessions)
+    ok = generate_fleet_report(args.output, fleet, args.logo)
+    print(f"{len(fleet)} pack(s) -> {args.output}" if ok else "Failed to generate fleet report")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,15 @@ from reportlab.lib import colors
 from reportlab.lib.units import mm
 import matplotlib.pyplot as plt
 
+from src.core.sample import BMSSample
+
 def generate_pdf_report(save_path, data, logo_path=None):
     """
     Generate a professional PDF report for the BMS data.
+    `data` may be a BMSSample or a firmware-style dict.
     """
+    if isinstance(data, BMSSample):
+        data = data.to_dict()
     
     # Create plot image (smaller height)
     plot_img_path = save_path.replace('.pdf', '_plot.png')
@@ -0,0 +1,94 @@
+import pytest
+
+from src.core.catalog import Catalog, summarize_samples
+from src.core.sample import BMSSample, PackInfo, make_sample_dtype, samples_to_array
+from src.core.session import SessionWriter
+
+
+def _write_session(path, serial, cells_per_sample, start_ts=1000.0, safety_status=0):
+    pack = PackInfo(port="COM3", serial=serial, gauge_type="BQ40Z50")
+    with SessionWriter(path, max_cells=4, pack=pack) as writer:
+        for i, cells in enumerate(cells_per_sample):
+            writer.append(BMSSample(recv_ts=start_ts + i, port="COM3", serial=serial,
+                                    gauge_type="BQ40Z50", safety_status=safety_status, cells=cells))
+    return path
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with Catalog(tmp_path / "catalog.db") as cat:
+        yield cat
+
+
+def test_summarize_samples():
+    samples = [
+        BMSSample(recv_ts=10.0, cells=[3700, 3710, 3705, 3702]),
+        BMSSample(recv_ts=11.0, safety_status=0b10, cells=[3690, 3740, 3700, 3701]),
+        BMSSample(recv_ts=12.0, cells=[]),
+    ]
+    row = summarize_samples(samples_to_array(samples, make_sample_dtype(4)), PackInfo("COM3", "PK-1", "BQ"))
+    assert (row["pack_serial"], row["port"], row["gauge_type"]) == ("PK-1", "COM3", "BQ")
+    assert (row["start_ts"], row["end_ts"], row["n_samples"]) == (10.0, 12.0, 3)
+    assert (row["min_cell_mv"], row["max_cell_mv"], row["max_delta_mv"]) == (3690, 3740, 50)
+    assert (row["safety_alarms"], row["pf_alarms"], row["passed"]) == (1, 0, 0)
+    assert summarize_samples(samples_to_array([], make_sample_dtype(4))) is None
+
+
+def test_scan_skips_unchanged_and_picks_up_changed(tmp_path, catalog):
+    sessions = tmp_path / "sessions"
+    sessions.mkdir()
+    _write_session(sessions / "a.amps", "PK-1", [[3700, 3710, 3705, 3702]])
+    _write_session(sessions / "b.amps", "PK-2", [[3700, 3700, 3700, 3700]])
+    (sessions / "notes.txt").write_text("not a session")
+    (sessions / "broken.amps").write_bytes(b"junk")
+
+    assert catalog.scan(str(sessions)) == 2
+    assert catalog.scan(str(sessions)) == 0
+
+    _write_session(sessions / "a.amps", "PK-1", [[3700, 3710, 3705, 3702], [3700, 3760, 3705, 3702]])
+    assert catalog.scan(str(sessions)) == 1
+    (row,) = catalog.query(pack_serial="PK-1")
+    assert (row["n_samples"], row["max_delta_mv"]) == (2, 60)
+
+
+def test_query_filters(tmp_path, catalog):
+    for i, delta in enumerate((10, 30, 31)):
+        path = _write_session(tmp_path / f"s{i}.amps", f"PK-{i}", [[3700, 3700 + delta, 3700, 3700]],
+                              start_ts=1000.0 + i * 100, safety_status=0b10 if i == 2 else 0)
+        catalog.index_session(path)
+
+    def serials(**filters):
+        return [r["pack_serial"] for r in catalog.query(**filters)]
+
+    assert serials() == ["PK-2", "PK-1", "PK-0"]
+    assert serials(delta_above_mv=30) == ["PK-2"]
+    assert serials(since=1100.0) == ["PK-2", "PK-1"]
+    assert serials(until=1000.0) == ["PK-0"]
+    assert serials(passed=False) == ["PK-2"]
+    assert serials(port="COM3", limit=1) == ["PK-2"]
+    with pytest.raises(ValueError):
+        catalog.query(voltage=1)
+
+
+def test_index_report(tmp_path, catalog):
+    sample = BMSSample(port="COM3", serial="PK-9", gauge_type="BQ40Z50", pf_status=1,
+                       cells=[3700, 3725, 3710])
+    catalog.index_report(tmp_path / "r.pdf", sample, session_path=tmp_path / "s.amps", created_ts=50.0)
+    catalog.index_report(tmp_path / "old.pdf", {"Cells": [3700]}, created_ts=10.0)
+
+    rows = catalog.reports_for()
+    assert [r["created_ts"] for r in rows] == [50.0, 10.0]
+    (row,) = catalog.reports_for(pack_serial="PK-9")
+    assert row["session_path"] == str(tmp_path / "s.amps")
+    assert (row["min_cell_mv"], row["max_cell_mv"], row["delta_mv"]) == (3700, 3725, 25)
+    assert (row["pf_alarms"], row["passed"]) == (1, 0)
+    assert [r["path"] for r in catalog.reports_for(since=20.0)] == [str(tmp_path / "r.pdf")]
+
+
+def test_scan_indexes_reports_by_name(tmp_path, catalog):
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    (reports / "Amplyze_Report_2024-05-01_10-30.pdf").write_bytes(b"%PDF")
+    (reports / "something_else.pdf").write_bytes(b"%PDF")
+    assert catalog.scan(reports_dir=str(reports)) == 1
+    assert catalog.scan(reports_dir=str(reports)) == 0
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.core.sample import BMSSample, PackInfo
+from src.core.session import SessionWriter
+from src.utils.fleet_report import FleetSummary, build_fleet, generate_fleet_report
+
+
+def _pack(serial, delta=10, temp=25.0, safety_status=0, capacity=2500, cycles=10):
+    return BMSSample(port="COM3", serial=serial, temperature_c=temp, safety_status=safety_status,
+                     full_capacity_mah=capacity, cycle_count=cycles,
+                     cells=[3700, 3700 + delta, 3705, 3702])
+
+
+def _write_session(path, serial, temps, deltas):
+    pack = PackInfo(port="COM5", serial=serial)
+    with SessionWriter(path, max_cells=4, pack=pack) as writer:
+        for i, (temp, delta) in enumerate(zip(temps, deltas)):
+            writer.append(BMSSample(recv_ts=100.0 + i, port="COM5", serial=serial, temperature_c=temp,
+                                    full_capacity_mah=2400 + i, cells=[3700, 3700 + delta, 3701, 3702]))
+    return path
+
+
+def test_lot_statistics():
+    fleet = FleetSummary()
+    fleet.add_samples([_pack(f"PK-{i}", capacity=2000 + 100 * i, cycles=i) for i in range(11)])
+    stats = fleet.stats()
+    lo, p5, median, mean, p95, hi = stats["full_capacity_mah"]
+    assert (lo, median, mean, hi) == (2000, 2500, 2500, 3000)
+    assert p5 == pytest.approx(2050) and p95 == pytest.approx(2950)
+    assert stats["cycle_count"][0] == 0 and stats["cycle_count"][-1] == 10
+    assert fleet.packs["serial"].tolist()[:2] == [b"PK-0", b"PK-1"]
+
+
+def test_worst_orders_failed_then_delta_then_temperature():
+    fleet = FleetSummary()
+    fleet.add_samples([
+        _pack("ok-small", delta=5),
+        _pack("ok-big-cool", delta=40, temp=20.0),
+        _pack("failed-small", delta=1, safety_status=0b10),
+        _pack("ok-big-hot", delta=40, temp=45.0),
+        _pack("failed-big", delta=30, safety_status=0b10),
+    ])
+    worst = [s.decode() for s in fleet.worst()["serial"]]
+    assert worst == ["failed-big", "failed-small", "ok-big-hot", "ok-big-cool", "ok-small"]
+    assert len(fleet.worst(2)) == 2
+    assert fleet.passed().tolist() == [True, True, False, True, False]
+
+
+def test_storage_grows_by_doubling():
+    fleet = FleetSummary(capacity=4)
+    fleet.add_samples([_pack(f"PK-{i}") for i in range(5)])
+    assert len(fleet._rows) == 8
+    fleet.add_samples([_pack(f"PK-{i}") for i in range(5, 8)])
+    assert len(fleet._rows) == 8
+    fleet.add_samples([_pack(f"PK-{i}") for i in range(8, 30)])
+    assert len(fleet._rows) == 30
+    assert len(fleet) == 30
+    assert fleet.packs["serial"][-1] == b"PK-29"
+
+
+def test_add_session_reduces_to_one_row(tmp_path):
+    path = _write_session(tmp_path / "s.amps", "PK-7", temps=[25.0, 41.5, 30.0], deltas=[5, 22, 9])
+    fleet = FleetSummary()
+    assert fleet.add_session(path)
+    (row,) = fleet.packs
+    assert (row["serial"], row["port"]) == (b"PK-7", b"COM5")
+    assert (row["min_cell_mv"], row["max_cell_mv"], row["delta_mv"]) == (3700, 3722, 22)
+    assert row["max_temp_c"] == pytest.approx(41.5)
+    assert (row["full_capacity_mah"], row["samples"], row["ts"]) == (2402, 3, 100.0)
+
+
+def test_build_fleet_reports_progress_and_can_stop(tmp_path):
+    sources = [
+        _write_session(tmp_path / "a.amps", "PK-A", temps=[25.0], deltas=[5]),
+        str(tmp_path / "missing.amps"),
+        _pack("PK-S"),
+    ]
+    calls = []
+    fleet = build_fleet(sources, progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(1, 3), (2, 3), (3, 3)]
+    assert sorted(fleet.packs["serial"].tolist()) == [b"PK-A", b"PK-S"]
+
+    assert build_fleet(sources, progress=lambda done, total: done < 2) is None
+
+
+def test_generate_fleet_report(tmp_path):
+    fleet = build_fleet([_pack(f"PK-{i}", delta=i % 40, temp=20.0 + i % 15) for i in range(200)])
+    out = tmp_path / "fleet.pdf"
+    assert generate_fleet_report(str(out), fleet)
+    assert out.read_bytes().startswith(b"%PDF")
+    assert np.count_nonzero(~fleet.passed()) == 0
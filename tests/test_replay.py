@@ -0,0 +1,92 @@
+import pytest
+
+from src.core.replay import SessionReplay
+from src.core.sample import BMSSample
+from src.core.session import SessionWriter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def session(tmp_path):
+    # 100 samples, one per second of session time
+    path = tmp_path / "s.amps"
+    with SessionWriter(path, max_cells=2) as writer:
+        for i in range(100):
+            writer.append(BMSSample(recv_ts=1000.0 + i, pack_voltage_mv=i, cells=[3700, 3701]))
+    return path
+
+
+def _voltages(block):
+    return block["pack_voltage_mv"].tolist()
+
+
+def test_advance_follows_the_virtual_clock(session, clock):
+    with SessionReplay(session, speed=10, clock=clock) as replay:
+        assert len(replay.advance()) == 0
+        replay.play()
+        assert _voltages(replay.advance()) == [0]
+        clock.now = 1.0
+        assert _voltages(replay.advance()) == list(range(1, 11))
+        assert len(replay.advance()) == 0
+        clock.now = 20.0
+        assert replay.position == 11
+        assert len(replay.advance()) == 89
+        assert replay.finished
+
+
+def test_advance_is_bounded_by_chunk_size(session, clock):
+    with SessionReplay(session, speed=1000, chunk_size=30, clock=clock) as replay:
+        replay.play()
+        clock.now = 1.0
+        assert [len(replay.advance()) for _ in range(5)] == [30, 30, 30, 10, 0]
+
+
+def test_pause_stops_the_clock(session, clock):
+    with SessionReplay(session, speed=1, clock=clock) as replay:
+        replay.play()
+        clock.now = 5.0
+        replay.pause()
+        assert replay.current_ts() == 1005.0
+        clock.now = 50.0
+        assert len(replay.advance()) == 0
+        assert replay.current_ts() == 1005.0
+        replay.play()
+        clock.now = 52.0
+        assert _voltages(replay.advance()) == list(range(0, 8))
+
+
+def test_set_speed_does_not_jump(session, clock):
+    with SessionReplay(session, speed=1, clock=clock) as replay:
+        replay.play()
+        clock.now = 4.0
+        replay.set_speed(10)
+        assert replay.current_ts() == 1004.0
+        clock.now = 5.0
+        assert replay.current_ts() == 1014.0
+
+
+def test_seek(session, clock):
+    with SessionReplay(session, speed=1, clock=clock) as replay:
+        replay.seek(1050.5)
+        assert replay.position == 51
+        replay.play()
+        assert len(replay.advance()) == 0
+        clock.now = 1.0
+        assert _voltages(replay.advance()) == [51]
+
+        replay.seek(0)
+        assert (replay.position, replay.current_ts()) == (0, 1000.0)
+        replay.seek(5000)
+        assert replay.finished
@@ -0,0 +1,55 @@
+import struct
+
+import pytest
+
+from src.core.sample import BMSSample, PackInfo, make_sample_dtype
+from src.core.session import (
+    SessionWriter, SessionReader, SESSION_MAGIC, SESSION_VERSION, read_header
+)
+
+
+def test_round_trip_keeps_all_cells(tmp_path):
+    path = tmp_path / "s.amps"
+    sample = BMSSample(recv_ts=1.0, port="COM3", serial="PK-1", gauge_type="BQ40Z50",
+                       cells=range(3700, 3796))
+    with SessionWriter(path, max_cells=96, pack=PackInfo.of(sample)) as writer:
+        writer.append(sample)
+    with SessionReader(path) as reader:
+        assert reader.samples["n_cells"][0] == 96
+        assert reader.pack == PackInfo.of(sample)
+        got = BMSSample.from_record(reader.samples[0], reader.pack)
+    assert got.to_dict() == sample.to_dict()
+    assert got.port == sample.port
+
+
+def test_records_are_sized_to_the_pack(tmp_path):
+    with SessionWriter(tmp_path / "s.amps", max_cells=4) as writer:
+        writer.append(BMSSample(cells=range(3700, 3704)))
+    assert writer.dtype.itemsize == make_sample_dtype(4).itemsize < 64
+
+
+def test_writer_rejects_samples_from_another_pack(tmp_path):
+    with SessionWriter(tmp_path / "s.amps", max_cells=4, pack=PackInfo(serial="PK-1")) as writer:
+        with pytest.raises(ValueError, match="pack"):
+            writer.append(BMSSample(serial="PK-2", cells=range(3700, 3704)))
+
+
+def test_writer_rejects_samples_that_do_not_fit(tmp_path):
+    with SessionWriter(tmp_path / "s.amps", max_cells=16) as writer:
+        with pytest.raises(ValueError):
+            writer.append(BMSSample(cells=range(3700, 3796)))
+
+
+def test_old_version_is_rejected(tmp_path):
+    path = tmp_path / "old.amps"
+    path.write_bytes(struct.pack("<4sHH8x", SESSION_MAGIC, 1, 16) + bytes(100))
+    with pytest.raises(ValueError, match="version"):
+        read_header(path)
+
+
+def test_record_size_mismatch_is_rejected(tmp_path):
+    path = tmp_path / "bad.amps"
+    size = make_sample_dtype(16).itemsize + 8
+    path.write_bytes(struct.pack("<4sHHI4x", SESSION_MAGIC, SESSION_VERSION, 16, size))
+    with pytest.raises(ValueError, match="record size"):
+        read_header(path)
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from src.core.bms import BMSManager
+from src.core.sample import BMSSample, make_sample_dtype
+from src.core.telemetry import TelemetryServer, TelemetryClient
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def _read(client, n):
+    got = []
+    while len(got) < n:
+        block = client.read_block()
+        got.extend(BMSSample.from_record(rec, client.pack) for rec in block)
+    return got
+
+
+@pytest.fixture
+def server():
+    srv = TelemetryServer(port=0, queue_size=8)
+    srv.start()
+    yield srv
+    srv.stop()
+
+
+def test_fan_out_to_several_clients(server):
+    manager = BMSManager()
+    manager.add_listener(server.publish)
+    clients = [TelemetryClient(port=server.address[1], timeout=2) for _ in range(3)]
+    _wait_for(lambda: server.client_count == 3)
+
+    sent = [manager.read_data(simulation_mode=True) for _ in range(5)]
+    for client in clients:
+        got = _read(client, len(sent))
+        assert [s.pack_voltage_mv for s in got] == [s.pack_voltage_mv for s in sent]
+        client.close()
+
+
+def test_framing_round_trip(server):
+    sample = BMSSample(recv_ts=123.5, port="COM7", serial="PK-42", gauge_type="BQ40Z50",
+                       pack_voltage_mv=15000, current_ma=-250, temperature_c=25.3,
+                       cycle_count=17, safety_status=2, pf_status=1,
+                       remain_capacity_mah=1800, full_capacity_mah=2500,
+                       cells=range(3700, 3796))
+    with TelemetryClient(port=server.address[1], timeout=2) as client:
+        _wait_for(lambda: server.client_count == 1)
+        server.publish(sample)
+        (got,) = _read(client, 1)
+    assert got.to_dict() == sample.to_dict()
+    assert (got.recv_ts, got.port) == (sample.recv_ts, sample.port)
+
+
+def test_layout_follows_the_pack(server):
+    first = BMSSample(port="COM7", serial="PK-1", cells=range(3700, 3704))
+    second = BMSSample(port="COM7", serial="PK-2", cells=range(3700, 3704))
+    with TelemetryClient(port=server.address[1], timeout=2) as client:
+        _wait_for(lambda: server.client_count == 1)
+        server.publish(first)
+        server.publish(second)
+        got = _read(client, 2)
+    assert [s.serial for s in got] == ["PK-1", "PK-2"]
+
+
+def test_records_follow_the_pack_cell_count(server):
+    small = BMSSample(recv_ts=1.0, cells=range(3700, 3704))
+    large = BMSSample(recv_ts=2.0, cells=[3700 + i % 50 for i in range(300)])
+    with TelemetryClient(port=server.address[1], timeout=2) as client:
+        _wait_for(lambda: server.client_count == 1)
+        server.publish(small)
+        block = client.read_block()
+        assert block.dtype.itemsize == make_sample_dtype(4).itemsize
+        server.publish(large)
+        server.publish(small)
+        got = _read(client, 2)
+    assert [list(s.cells) for s in got] == [list(large.cells), list(small.cells)]
+
+
+def test_stalled_client_drops_oldest_without_blocking(server):
+    stalled = TelemetryClient(port=server.address[1], timeout=2)
+    _wait_for(lambda: server.client_count == 1)
+    sample = BMSSample(cells=range(3700, 3956))
+
+    # Never read from the client: once the socket buffers fill, its queue
+    # must drop the oldest frames while publish() keeps returning promptly.
+    start = time.perf_counter()
+    for _ in range(20000):
+        server.publish(sample)
+        if server.dropped:
+            break
+    assert server.dropped > 0
+    assert time.perf_counter() - start < 5
+    stalled.close()
+
+
+def test_stop_releases_port_and_restarts(server):
+    port = server.address[1]
+    client = TelemetryClient(port=port, timeout=2)
+    _wait_for(lambda: server.client_count == 1)
+
+    start = time.perf_counter()
+    server.stop()
+    assert time.perf_counter() - start < 0.5
+    client.close()
+
+    restarted = TelemetryServer(port=port)
+    try:
+        assert restarted.start()[1] == port
+        with TelemetryClient(port=port, timeout=2):
+            _wait_for(lambda: restarted.client_count == 1)
+    finally:
+        restarted.stop()